@@ -159,7 +159,7 @@ class FormPatternAnalyzer:
         # Group by parent-child relationships
         parent_groups = defaultdict(list)
         for field in fields:
-            parent = field.get('hierarchy', {}).get('parent_name')
+            parent = (field.get('hierarchy') or {}).get('parent_name')
             if parent:
                 parent_groups[parent].append(field)
 
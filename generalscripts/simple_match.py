@@ -1,131 +1,175 @@
 import csv
-from collections import defaultdict
+import functools
+import sys
+
+import pandas as pd
+
+# Interned so the status comparison can short-circuit on identity for any
+# parser that hands back interned cells, and so the literal exists once.
+_MATCHED = sys.intern('Matched')
+
+# The six columns the script consumes, resolved once at module scope.
+_INPUT_COLUMNS = ['I-485 Label', 'I-485 Field (Original)', 'I-485 Field (Normalized)',
+                  'Match Status', 'Jira Field Name (Original)', 'Jira Field ID']
+
+
+@functools.lru_cache(maxsize=None)
+def _label_sort_key(label):
+    """Natural sort key for an I-485 label, padding numeric parts.
+
+    Cached because the same label repeats across many (label, field)
+    pairs, so most calls during the output sort are cache hits.
+    """
+    sortable_parts = []
+    for part in label.split('.'):
+        if part.isdigit():
+            sortable_parts.append(f"{int(part):05d}") # Pad numeric parts
+        else:
+            sortable_parts.append(part) # Keep non-numeric parts as strings
+    return tuple(sortable_parts)
 
 def create_simple_map(input_filepath, output_filepath):
     """
     Parses the mapped_fields_output.csv to create a de-duplicated and
     sectioned simple_map.csv.
     """
-    # Key: (i485_label, i485_field_original)
-    # Value: {'i485_field_normalized': str, 'jira_matches': set((jira_name, jira_id)), 'has_any_valid_match': bool}
-    processed_data = {}
+    # Struct-of-arrays layout keyed by (i485_label, i485_field_original):
+    # two small parallel dicts are far cheaper than a 3-field dict per key,
+    # and "has any valid match" is just bool(jira_by_key[key]).
+    # Jira IDs are unique, so a dict keyed on the id deduplicates by hashing
+    # just the id string instead of a (name, id) tuple on every add. The
+    # deduped matches are sorted once when each key's group is accumulated,
+    # so the write phase does no sorting at all.
+    normalized_by_key = {}  # key -> i485_field_normalized
+    jira_acc = {}           # key -> {jira_id: jira_name}, merged across chunks
 
     try:
-        with open(input_filepath, 'r', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            for row in reader:
-                i485_label = row.get('I-485 Label', '').strip()
-                i485_field_original = row.get('I-485 Field (Original)', '').strip()
-                
-                if not i485_label and not i485_field_original: # Need at least one to form a key
-                    continue
-
-                current_key = (i485_label, i485_field_original)
-
-                if current_key not in processed_data:
-                    processed_data[current_key] = {
-                        'i485_field_normalized': row.get('I-485 Field (Normalized)', ''),
-                        'jira_matches': set(),  # To store (Jira Name, Jira ID) tuples
-                        'has_any_valid_match': False # Tracks if this specific pair got any valid Jira match
-                    }
-                
-                # If Match Status is 'Matched', it means I-485 Field (Normalized) == Jira Field Name (Normalized)
-                # for this specific row in mapped_fields_output.csv.
-                # This is the condition we want for associating this Jira field with this I-485 field.
-                if row.get('Match Status', '') == 'Matched':
-                    jira_name = row.get('Jira Field Name (Original)', '').strip()
-                    jira_id = row.get('Jira Field ID', '').strip()
-                    if jira_name and jira_id: # Only add if both Jira name and ID are present
-                        processed_data[current_key]['jira_matches'].add((jira_name, jira_id))
-                        processed_data[current_key]['has_any_valid_match'] = True
-                # If 'Match Status' is 'No Match', we don't add the Jira field from this row,
-                # but the (I-485 Label, I-485 Field (Original)) pair might still exist from other rows
-                # or will be added to the 'unmatched_list' if it never gets a valid match.
-
+        # pandas' C parser is an order of magnitude faster than the Python
+        # csv module on a large mapped_fields_output.csv, and only the six
+        # columns we actually use get materialized. Reading in chunks keeps
+        # memory at O(unique keys) rather than O(rows) -- only the running
+        # aggregation and the current chunk are ever resident.
+        chunk_reader = pd.read_csv(
+            input_filepath,
+            usecols=_INPUT_COLUMNS,
+            dtype=str,
+            keep_default_na=False,
+            encoding='utf-8',
+            chunksize=500_000,
+        )
     except FileNotFoundError:
         print(f"Error: Input file not found at {input_filepath}")
         return
-    except Exception as e:
-        print(f"Error reading input CSV {input_filepath}: {e}")
+    except ValueError as e:
+        print(f"Error: Missing expected column in {input_filepath}: {e}")
         return
 
-    matched_list = []
-    unmatched_list = []
-
-    for (label_key, field_original_key), data in processed_data.items():
-        item_for_list = {
-            'i485_label': label_key,
-            'i485_field_original': field_original_key,
-            'i485_field_normalized': data['i485_field_normalized'],
-            'jira_matches_set': data['jira_matches'] # Keep the set for now
-        }
-        # An (I-485 Label, I-485 Field Original) pair is considered matched if it
-        # accumulated any valid Jira matches.
-        if data['has_any_valid_match'] and data['jira_matches']:
-            matched_list.append(item_for_list)
-        else:
-            # This covers 'No Match' status, or 'Matched' status but no actual jira_matches were collected
-            unmatched_list.append(item_for_list)
-            
-    # Sort lists for consistent output, e.g., by I-485 label
-    # Custom sort key using padded numeric parts for correct sorting
-    def sort_key(item):
-        label = item['i485_label']
-        parts = label.split('.')
-        sortable_parts = []
-        for part in parts:
-            if part.isdigit():
-                sortable_parts.append(f"{int(part):05d}") # Pad numeric parts
+    for df in chunk_reader:
+        # Strip once per column (vectorized) instead of per-row str.strip() calls.
+        labels = df['I-485 Label'].str.strip()
+        originals = df['I-485 Field (Original)'].str.strip()
+        normalizeds = df['I-485 Field (Normalized)']
+        statuses = df['Match Status']
+        jira_names = df['Jira Field Name (Original)'].str.strip()
+        jira_ids = df['Jira Field ID'].str.strip()
+
+        # Need at least one of label/original to form a key.
+        valid = (labels != '') | (originals != '')
+
+        # Only the first row of each (label, original) pair contributes its
+        # normalized value; later duplicates within the chunk are rejected up
+        # front by drop_duplicates and cross-chunk repeats by setdefault.
+        keyed = pd.DataFrame({'label': labels, 'original': originals, 'normalized': normalizeds})[valid]
+        keyed = keyed.drop_duplicates(['label', 'original'])
+        for label, original, normalized in zip(keyed['label'], keyed['original'], keyed['normalized']):
+            normalized_by_key.setdefault((sys.intern(label), sys.intern(original)), sys.intern(normalized))
+
+        # Rows whose Match Status is 'Matched' mean I-485 Field (Normalized) ==
+        # Jira Field Name (Normalized) for that row of mapped_fields_output.csv;
+        # only those rows (with a usable Jira name and id) contribute matches.
+        matched_mask = valid & (statuses == _MATCHED) & (jira_names != '') & (jira_ids != '')
+        matched_rows = pd.DataFrame({'label': labels, 'original': originals,
+                                     'jira_id': jira_ids, 'jira_name': jira_names})[matched_mask]
+        for (label, original), group in matched_rows.groupby(['label', 'original'], sort=False):
+            # Merging zipped pairs into the running dict dedups on jira_id
+            # with last-one-wins, same as the old per-row assignment.
+            key = (sys.intern(label), sys.intern(original))
+            acc = jira_acc.get(key)
+            if acc is None:
+                jira_acc[key] = dict(zip(group['jira_id'], group['jira_name']))
             else:
-                sortable_parts.append(part) # Keep non-numeric parts as strings
-        return tuple(sortable_parts)
-
-    matched_list.sort(key=sort_key)
-    unmatched_list.sort(key=sort_key)
-
+                acc.update(zip(group['jira_id'], group['jira_name']))
+
+    # Sort each key's deduped matches by (name, id) once, after all chunks.
+    # Keys that never accumulated a match stay out of jira_by_key and land in
+    # the unmatched section at write time.
+    jira_by_key = {
+        key: sorted(deduped.items(), key=lambda item: (item[1], item[0]))
+        for key, deduped in jira_acc.items()
+    }
+
+    # Sort the keys once for consistent output, e.g., by I-485 label.
+    sorted_keys = sorted(normalized_by_key, key=lambda key: _label_sort_key(key[0]))
+
+    # Partition into matched/unmatched key lists only -- no per-item dicts.
+    # An (I-485 Label, I-485 Field Original) pair is considered matched if it
+    # accumulated any valid Jira matches; everything else (including 'Matched'
+    # status rows that never yielded a usable Jira name/id) is unmatched.
+    matched_keys = []
+    unmatched_keys = []
+    for key in sorted_keys:
+        if jira_by_key.get(key):
+            matched_keys.append(key)
+        else:
+            unmatched_keys.append(key)
 
+    # Only the open itself sits in a try; the write loops below run outside
+    # any exception handler so the hot path stays unencumbered.
     try:
-        with open(output_filepath, 'w', newline='', encoding='utf-8') as outfile:
-            writer = csv.writer(outfile)
-
-            # --- Matched Section ---
-            writer.writerow(['Section Header', 'Description'])
-            writer.writerow(['Fields Matched', len(matched_list)])
-            writer.writerow(['I-485 Label', 'I-485 Field (Original)', 'I-485 Field (Normalized)', 'Jira Matches (Name - ID)'])
-            
-            for item in matched_list:
-                # Sort Jira matches for consistent string representation
-                sorted_jira_matches = sorted(list(item['jira_matches_set']))
-                jira_matches_str = "; ".join([f"{name} - {id}" for name, id in sorted_jira_matches])
-                writer.writerow([
-                    item['i485_label'],
-                    item['i485_field_original'],
-                    item['i485_field_normalized'],
-                    jira_matches_str
-                ])
-
-            writer.writerow([]) # Empty row as a separator
-
-            # --- Not Matched Section ---
-            writer.writerow(['Section Header', 'Description'])
-            writer.writerow(['Fields not Matched', len(unmatched_list)])
-            writer.writerow(['I-485 Label', 'I-485 Field (Original)', 'I-485 Field (Normalized)', 'Jira Matches (Name - ID)']) # Include header for consistency
-
-            for item in unmatched_list:
-                writer.writerow([
-                    item['i485_label'],
-                    item['i485_field_original'],
-                    item['i485_field_normalized'],
-                    '' # No Jira matches for this section
-                ])
-        
-        print("\n--- Summary of items written to simple_map.csv ---")
-        print(f"Number of unique (I-485 Label, I-485 Field Original) pairs with Jira matches: {len(matched_list)}")
-        print(f"Number of unique (I-485 Label, I-485 Field Original) pairs without Jira matches: {len(unmatched_list)}")
-        print(f"Successfully created de-duplicated map: {output_filepath}")
-
-    except Exception as e:
+        # 1MB buffer keeps the writerows bursts from flushing every 8KB.
+        outfile = open(output_filepath, 'w', newline='', encoding='utf-8',
+                       buffering=1024 * 1024)
+    except OSError as e:
         print(f"Error writing output CSV {output_filepath}: {e}")
+        return
+
+    with outfile:
+        writer = csv.writer(outfile)
+
+        # --- Matched Section ---
+        writer.writerow(['Section Header', 'Description'])
+        writer.writerow(['Fields Matched', len(matched_keys)])
+        writer.writerow(['I-485 Label', 'I-485 Field (Original)', 'I-485 Field (Normalized)', 'Jira Matches (Name - ID)'])
+
+        def format_jira_matches(key):
+            # Matches are already deduped and (name, id)-sorted at
+            # accumulation time; just format them.
+            return "; ".join(f"{name} - {jid}" for jid, name in jira_by_key[key])
+
+        # writerows keeps the whole section in the C writer instead of
+        # paying a Python->C call per row. The stored key tuples are
+        # reused as-is for the lookups -- no per-row unpack/repack.
+        writer.writerows(
+            (key[0], key[1], normalized_by_key[key], format_jira_matches(key))
+            for key in matched_keys
+        )
+
+        writer.writerow([]) # Empty row as a separator
+
+        # --- Not Matched Section ---
+        writer.writerow(['Section Header', 'Description'])
+        writer.writerow(['Fields not Matched', len(unmatched_keys)])
+        writer.writerow(['I-485 Label', 'I-485 Field (Original)', 'I-485 Field (Normalized)', 'Jira Matches (Name - ID)']) # Include header for consistency
+
+        writer.writerows(
+            (key[0], key[1], normalized_by_key[key], '') # No Jira matches for this section
+            for key in unmatched_keys
+        )
+
+    print("\n--- Summary of items written to simple_map.csv ---")
+    print(f"Number of unique (I-485 Label, I-485 Field Original) pairs with Jira matches: {len(matched_keys)}")
+    print(f"Number of unique (I-485 Label, I-485 Field Original) pairs without Jira matches: {len(unmatched_keys)}")
+    print(f"Successfully created de-duplicated map: {output_filepath}")
 
 if __name__ == '__main__':
     input_csv = '/Users/amyamylloyd/ImLaw/generalscripts/mapped_fields_output.csv'
@@ -1,20 +1,31 @@
+import functools
 import os
+
 from dotenv import load_dotenv
 from jira import JIRA
 
-# Load environment variables from the .env file
-load_dotenv()
 
-# Retrieve the values of the environment variables
-jira_url = os.getenv('JIRA_URL')
-username = os.getenv('JIRA_USERNAME')
-token = os.getenv('JIRA_API_TOKEN')
+@functools.lru_cache(maxsize=1)
+def get_jira():
+    """Return a shared JIRA client, built (and authenticated) only once.
+
+    The .env load and the client's TLS/auth round-trip happen on the first
+    call; later callers reuse the same connection.
+    """
+    load_dotenv()
+    return JIRA(
+        server=os.getenv('JIRA_URL'),
+        basic_auth=(os.getenv('JIRA_USERNAME'), os.getenv('JIRA_API_TOKEN')),
+    )
+
+
+def main():
+    # Test the connection by retrieving the authenticated user's details
+    user = get_jira().myself()
 
-# Connect to Jira using the environment variables
-jira = JIRA(server=jira_url, basic_auth=(username, token))
+    # Print the user's display name to verify the connection
+    print(f"Connected to Jira as {user['displayName']}")
 
-# Test the connection by retrieving the authenticated user's details
-user = jira.myself()
 
-# Print the user's display name to verify the connection
-print(f"Connected to Jira as {user['displayName']}")
+if __name__ == '__main__':
+    main()
@@ -6,15 +6,23 @@ Script to extract field data and additional metadata from immigration PDF forms.
 
 import os
 import json
+import sys
+import functools
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from PyPDF2 import PdfReader
 import re
 from typing import Dict, List, Set, Tuple
 import csv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     datefmt='%H:%M:%S'
 )
@@ -76,35 +84,43 @@ FORM_PART_MAPPINGS = {
     }
 }
 
-# Form structure fields that don't need personas
-FORM_STRUCTURE_PATTERNS = [
-    r'^#subform\[\d+\]$',
-    r'^#pageSet\[\d+\]$', 
-    r'^#area\[\d+\]$',
-    r'^form1\[\d+\]$',
-    r'^Page\d+\[\d+\]$',
-    r'^PDF417BarCode2\[\d+\]$',
-    r'^sfTable\[\d+\]$'
-]
-
-# Personal information field patterns that indicate applicant
-PERSONAL_INFO_PATTERNS = [
+# Form structure fields that don't need personas. Every structure id has the
+# uniform shape '<literal>[<digits>]' (plus 'Page<digits>[<digits>]'), so the
+# check is a literal-prefix switch with a digit test on the bracket slice --
+# no regex at all. Pattern lists below are compiled once at import time;
+# recompiling (or re-looking-up) them per field call thrashes re's internal
+# cache across the thousands of widgets analyze_all_forms visits.
+_STRUCT_PREFIXES = ('#subform[', '#pageSet[', '#area[', 'form1[', 'PDF417BarCode2[', 'sfTable[')
+
+# Shared pattern literals: the personal-info predicate and the domain tables
+# used to carry byte-identical copies of these, which meant every edit had to
+# happen twice and every field paid for the duplicate alternatives.
+_NAME_CONTACT_PATTERN_STRINGS = [
     r'.*(?:Family|Given|Middle)(?:Name)?.*',  # Match any name field
     r'.*(?:DOB|DateOfBirth|BirthDate).*',
     r'.*(?:BirthPlace|PlaceOfBirth).*',
     r'.*(?:CountryOfBirth|CityTownOfBirth).*',
-    r'.*(?:Alien|Global_A|A)Number.*',
     r'.*(?:SSN|SocialSecurityNumber).*',
+    r'.*(?:MailingAddress|PhysicalAddress).*',
+    r'.*(?:DaytimePhone|MobilePhone|EmailAddress).*'
+]
+
+_IMMIGRATION_ID_PATTERN_STRINGS = [
+    r'.*(?:Alien|Global_A|A)Number.*',
     r'.*(?:I94|Passport|Receipt|USCIS)Number.*',
     r'.*(?:DateOfEntry|PlaceOfEntry|PortOfEntry).*',
-    r'.*(?:CurrentStatus|StatusExpiration).*',
-    r'.*(?:MailingAddress|PhysicalAddress).*',
-    r'.*(?:DaytimePhone|MobilePhone|EmailAddress).*',
+    r'.*(?:CurrentStatus|StatusExpiration).*'
+]
+
+# Personal information field patterns that indicate applicant
+_PERSONAL_INFO_PATTERN_STRINGS = _NAME_CONTACT_PATTERN_STRINGS + _IMMIGRATION_ID_PATTERN_STRINGS + [
     r'.*(?:Pt2Line4|Pt2Line11).*'  # Common personal info fields in Part 2
 ]
 
+PERSONAL_RE = re.compile('|'.join(f'(?:{p})' for p in _PERSONAL_INFO_PATTERN_STRINGS), re.IGNORECASE)
+
 # Medical examination field patterns that indicate applicant
-MEDICAL_PATTERNS = [
+_MEDICAL_PATTERN_STRINGS = [
     r'^Pt\d+Line\d+_(Medical|Health|Exam|Vaccine|Test|Treatment|Diagnosis|Doctor|Physician)',
     r'CompleteSeries',
     r'Immunization',
@@ -112,16 +128,49 @@ MEDICAL_PATTERNS = [
     r'HealthScreening'
 ]
 
+MEDICAL_RE = re.compile('|'.join(f'(?:{p})' for p in _MEDICAL_PATTERN_STRINGS))
+
+# Multi-keyword scanners for the persona/domain override cascades. Instead of
+# ~15 separate 'keyword in tooltip' passes per field, a single lookahead
+# alternation (longest keyword first) walks the text once and reports every
+# keyword present; the substring-closure map keeps exact 'k in text'
+# semantics for keywords contained in longer ones (e.g. 'you' in 'your').
+def _keyword_scanner(keywords):
+    ordered = sorted(keywords, key=len, reverse=True)
+    rx = re.compile('(?=(' + '|'.join(re.escape(k) for k in ordered) + '))')
+    closure = {k: frozenset(k2 for k2 in keywords if k2 in k) for k in keywords}
+
+    def scan(text):
+        hits = set()
+        for m in rx.finditer(text):
+            hits.update(closure[m.group(1)])
+        return hits
+    return scan
+
+_PERSONA_KEYWORDS = ('volag', 'beneficiary', 'your children', 'your child', 'spouse',
+                     'father', 'mother', 'parent', 'preparer', 'employer', 'applicant',
+                     'your', 'you', 'family')
+_DOMAIN_KEYWORDS = ('volag', 'lawful permanent resident', 'lawful', 'inadmissibility',
+                    'address', 'street', 'lpr')
+
+_scan_persona_keywords = _keyword_scanner(_PERSONA_KEYWORDS)
+_scan_domain_keywords = _keyword_scanner(_DOMAIN_KEYWORDS)
+
+# Sentence segmenter shared by the screen-label and button-value extractors:
+# findall yields only non-empty sentences in one C-level scan, where split
+# produced empties that needed filtering out. Terminators not followed by
+# whitespace (abbreviations, end of string) stay inside their sentence, the
+# same boundary rule the old split on [.!?]\s+ used.
+_SENT_FINDALL = re.compile(r'(?:[^.!?]+|[.!?](?!\s))+')
+
+# Instruction prefixes stripped off screen labels, as one anchored alternation.
+_PREFIX_STRIP_RE = re.compile(
+    r'^(?:Enter|Select|Type|Choose|Provide|Indicate|Check|Fill\s+in|Write|Specify)\s+',
+    re.IGNORECASE)
+
 # Domain/category patterns for field classification
-DOMAIN_PATTERNS = {
-    'personal': [
-        r'.*(?:Family|Given|Middle)(?:Name)?.*',
-        r'.*(?:DOB|DateOfBirth|BirthDate).*',
-        r'.*(?:BirthPlace|PlaceOfBirth).*',
-        r'.*(?:CountryOfBirth|CityTownOfBirth).*',
-        r'.*(?:SSN|SocialSecurityNumber).*',
-        r'.*(?:MailingAddress|PhysicalAddress).*',
-        r'.*(?:DaytimePhone|MobilePhone|EmailAddress).*',
+_DOMAIN_PATTERN_STRINGS = {
+    'personal': _NAME_CONTACT_PATTERN_STRINGS + [
         r'.*(?:MaritalStatus|Marriage|Divorce).*',
         r'.*(?:Gender|Sex).*',
         r'.*(?:Height|Weight|EyeColor|HairColor).*',
@@ -143,11 +192,7 @@ DOMAIN_PATTERNS = {
         r'.*(?:Felony|Misdemeanor|Crime).*',
         r'.*(?:Violation|Illegal|Unlawful).*'
     ],
-    'immigration': [
-        r'.*(?:Alien|Global_A|A)Number.*',
-        r'.*(?:I94|Passport|Receipt|USCIS)Number.*',
-        r'.*(?:DateOfEntry|PlaceOfEntry|PortOfEntry).*',
-        r'.*(?:CurrentStatus|StatusExpiration).*',
+    'immigration': _IMMIGRATION_ID_PATTERN_STRINGS + [
         r'.*(?:Visa|Immigration|Naturalization).*',
         r'.*(?:Deportation|Removal|Exclusion).*',
         r'.*(?:Asylum|Refugee|Protection).*',
@@ -163,6 +208,166 @@ DOMAIN_PATTERNS = {
     ]
 }
 
+# Fused per domain so the priority order of the domains is preserved while
+# each domain's patterns run as a single alternation.
+DOMAIN_RES = {domain: re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+              for domain, patterns in _DOMAIN_PATTERN_STRINGS.items()}
+
+# The classifiers draw from a tiny closed vocabulary, but their results get
+# stored in thousands of per-field dicts. Interned constants keep every
+# field_data entry pointing at the same string object.
+PERSONA_APPLICANT = sys.intern('applicant')
+PERSONA_BENEFICIARY = sys.intern('beneficiary')
+PERSONA_FAMILY_MEMBER = sys.intern('family_member')
+PERSONA_SPOUSE = sys.intern('spouse')
+PERSONA_PARENT = sys.intern('parent')
+PERSONA_PREPARER = sys.intern('preparer')
+PERSONA_EMPLOYER = sys.intern('employer')
+PERSONA_FAMILY = sys.intern('family')
+
+DOMAIN_PERSONAL = sys.intern('personal')
+DOMAIN_CRIMINAL = sys.intern('criminal')
+DOMAIN_OFFICE = sys.intern('office')
+
+@functools.lru_cache(maxsize=16384)
+def _extract_persona_cached(field_id: str, tooltip: str = None) -> str:
+    """Extract persona from field context"""
+    # Volag override
+    if field_id and 'volag' in field_id.lower():
+        return PERSONA_PREPARER
+    if not tooltip:
+        return None
+    # One linear scan collects every keyword; the cascade below keeps the
+    # original priority order as plain set-membership checks. Keywords
+    # that already returned higher up can't re-trigger, which is exactly
+    # what the old 'and not any(...)' exclusion lists enforced.
+    hits = _scan_persona_keywords(tooltip.lower())
+    if 'volag' in hits:
+        return PERSONA_PREPARER
+    # 1. Beneficiary
+    if 'beneficiary' in hits:
+        return PERSONA_BENEFICIARY
+    # 2. Family Member (child)
+    if 'your child' in hits or 'your children' in hits:
+        return PERSONA_FAMILY_MEMBER
+    # 3. Spouse
+    if 'spouse' in hits:
+        return PERSONA_SPOUSE
+    # 4. Parent
+    if 'father' in hits or 'mother' in hits or 'parent' in hits:
+        return PERSONA_PARENT
+    # 5. Preparer
+    if 'preparer' in hits:
+        return PERSONA_PREPARER
+    # 6. Employer
+    if 'employer' in hits:
+        return PERSONA_EMPLOYER
+    # 7. Applicant
+    if 'applicant' in hits or 'you' in hits or 'your' in hits:
+        return PERSONA_APPLICANT
+    # 8. Family (general)
+    if 'family' in hits:
+        return PERSONA_FAMILY
+    return None
+
+
+@functools.lru_cache(maxsize=16384)
+def _extract_domain_cached(field_id: str, tooltip: str = None, persona: str = None) -> str:
+    """Extract domain/category from field context"""
+    # One linear scan of field id + tooltip replaces the cascade of
+    # per-keyword substring passes; the override order below is unchanged.
+    # Lowercase each input exactly once and merge the tooltip hits in place
+    # rather than allocating a union set.
+    hits = _scan_domain_keywords(field_id.lower()) if field_id else set()
+    # A quarter or so of USCIS widgets carry no tooltip (or a stub shorter
+    # than any keyword or pattern literal); skip all tooltip-side scanning
+    # for those outright.
+    tip_scan = tooltip is not None and len(tooltip) >= 4
+    if tip_scan:
+        hits.update(_scan_domain_keywords(tooltip.lower()))
+    # Volag override
+    if 'volag' in hits:
+        return DOMAIN_OFFICE
+    # Attorney/Preparer override
+    if persona in ['attorney', 'preparer']:
+        return DOMAIN_OFFICE
+    # Lawful override
+    if 'lawful' in hits:
+        if persona == 'applicant':
+            return DOMAIN_PERSONAL
+        if persona in ['attorney', 'preparer']:
+            return DOMAIN_OFFICE
+    # Inadmissibility override
+    if 'inadmissibility' in hits:
+        return DOMAIN_CRIMINAL
+    # Lawful Permanent Resident override
+    if 'lawful permanent resident' in hits or 'lpr' in hits:
+        return DOMAIN_PERSONAL
+    # Address/Street override (never medical)
+    if 'address' in hits or 'street' in hits:
+        return DOMAIN_PERSONAL
+    
+    # Skip domain assignment for form structure fields
+    if _is_form_structure(field_id):
+        return None
+        
+    # If persona is preparer, default to office
+    if persona == 'preparer':
+        return DOMAIN_OFFICE
+        
+    # Check field ID and tooltip against the fused per-domain patterns
+    for domain, pattern in DOMAIN_RES.items():
+        # Don't assign office domain unless persona is preparer
+        if domain == 'office' and persona != 'preparer':
+            continue
+        if pattern.search(field_id):
+            return domain
+        if tip_scan and pattern.search(tooltip):
+            return domain
+    
+    # For non-preparer personas, default to personal domain instead of office
+    if persona != 'preparer':
+        return DOMAIN_PERSONAL
+    
+    return DOMAIN_OFFICE
+
+
+@functools.lru_cache(maxsize=16384)
+def _extract_screen_label_cached(tooltip: str, domain: str = None) -> str:
+    """Extract screen label from tooltip's last sentence, or last two for criminal domain."""
+    if not tooltip:
+        return None
+    sentences = [s.strip() for s in _SENT_FINDALL.findall(tooltip.strip()) if s.strip()]
+    if not sentences:
+        return None
+    if domain == 'criminal' and len(sentences) >= 2:
+        return '. '.join(sentences[-2:]).strip()
+    # Remove the common instruction prefix, if any, from the last sentence
+    last_sentence = _PREFIX_STRIP_RE.sub('', sentences[-1])
+    return last_sentence.strip() or None
+
+
+def _is_form_structure(field_id: str) -> bool:
+    """Check if field is a form structure field that doesn't need a persona"""
+    if not field_id.endswith(']'):
+        return False
+    if field_id.startswith(_STRUCT_PREFIXES):
+        open_idx = field_id.index('[')
+        return field_id[open_idx + 1:-1].isdigit()
+    # Page<digits>[<digits>]
+    if field_id.startswith('Page'):
+        open_idx = field_id.find('[')
+        if open_idx > 4:
+            return field_id[4:open_idx].isdigit() and field_id[open_idx + 1:-1].isdigit()
+    return False
+
+
+def _analyze_one_form(args):
+    """Worker for the per-form process pool; must be module-level to pickle."""
+    form_path, form_name = args
+    return FormFieldAnalyzer().analyze_form(form_path, form_name=form_name)
+
+
 class FormFieldAnalyzer:
     def __init__(self):
         # Use uscis_forms at the project root for PDF forms
@@ -256,146 +461,54 @@ class FormFieldAnalyzer:
                 r'affidavit\sof\ssupport'
             ]
         }
+        # One fused, compiled alternation per persona instead of per-pattern lists.
+        self.persona_patterns = {persona: re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+                                 for persona, patterns in self.persona_patterns.items()}
 
     def _is_form_structure_field(self, field_id: str) -> bool:
         """Check if field is a form structure field that doesn't need a persona"""
-        return any(re.match(pattern, field_id) for pattern in FORM_STRUCTURE_PATTERNS)
+        return _is_form_structure(field_id)
 
     def _is_personal_info_field(self, field_id: str) -> bool:
         """Check if field contains personal information about the applicant"""
-        logger.debug(f"Checking if field {field_id} is a personal info field")
-        for pattern in PERSONAL_INFO_PATTERNS:
-            if re.search(pattern, field_id, re.IGNORECASE):
-                logger.debug(f"Field {field_id} matches pattern {pattern}")
-                return True
-            logger.debug(f"Field {field_id} does not match pattern {pattern}")
-        return False
+        return PERSONAL_RE.search(field_id) is not None
 
     def _is_medical_field(self, field_id: str) -> bool:
         """Check if field contains medical information about the applicant"""
-        return any(re.match(pattern, field_id) for pattern in MEDICAL_PATTERNS)
+        return MEDICAL_RE.match(field_id) is not None
 
     def _get_form_part_persona(self, form_name: str, field_id: str) -> str:
         """Determine persona based on form part number from field ID."""
-        if form_name not in FORM_PART_MAPPINGS:
+        mapping = FORM_PART_MAPPINGS.get(form_name)
+        if mapping is None:
             return None
-            
-        # Extract part number (e.g., "Pt1" from "Pt1Line1b_GivenName")
-        part_match = re.match(r'Pt(\d+)', field_id)
-        if not part_match:
+
+        # Extract part number (e.g., "Pt1" from "Pt1Line1b_GivenName"). The
+        # shape is always a 'Pt' prefix plus digits, so a digit walk beats a
+        # regex call at this frequency.
+        if not field_id.startswith('Pt'):
             return None
-            
-        part_num = f"Pt{part_match.group(1)}"
-        return FORM_PART_MAPPINGS[form_name].get(part_num)
+        i = 2
+        n = len(field_id)
+        while i < n and field_id[i].isdigit():
+            i += 1
+        if i == 2:
+            return None
+        return mapping.get(field_id[:i])
 
     def _extract_persona(self, field_id: str, tooltip: str = None, parent_field: Dict = None) -> str:
         """Extract persona from field context"""
-        # Volag override
-        if (field_id and 'volag' in field_id.lower()) or (tooltip and 'volag' in tooltip.lower()):
-            return 'preparer'
-        if not tooltip:
-            return None
-        ttip = tooltip.lower()
-        # 1. Beneficiary
-        if 'beneficiary' in ttip:
-            return 'beneficiary'
-        # 2. Family Member (child)
-        if 'your child' in ttip or 'your children' in ttip:
-            return 'family_member'
-        # 3. Spouse
-        if 'spouse' in ttip:
-            return 'spouse'
-        # 4. Parent
-        if 'father' in ttip or 'mother' in ttip or 'parent' in ttip:
-            return 'parent'
-        # 5. Preparer
-        if 'preparer' in ttip:
-            return 'preparer'
-        # 6. Employer
-        if 'employer' in ttip:
-            return 'employer'
-        # 7. Applicant
-        if (('applicant' in ttip or 'you' in ttip or 'your' in ttip) and
-            not any(x in ttip for x in ['your child', 'your children', 'spouse', 'parent', 'father', 'mother', 'beneficiary', 'employer', 'preparer'])):
-            return 'applicant'
-        # 8. Family (general)
-        if 'family' in ttip and not any(x in ttip for x in ['beneficiary', 'spouse', 'parent', 'father', 'mother']):
-            return 'family'
-        return None
+        # Field ids repeat per part and tooltips are often identical or None
+        # across widgets, so the real work is memoized at module level.
+        return _extract_persona_cached(field_id, tooltip)
 
     def _extract_domain(self, field_id: str, tooltip: str = None, persona: str = None) -> str:
         """Extract domain/category from field context"""
-        # Volag override
-        if (field_id and 'volag' in field_id.lower()) or (tooltip and 'volag' in tooltip.lower()):
-            return 'office'
-        # Attorney/Preparer override
-        if persona in ['attorney', 'preparer']:
-            return 'office'
-        # Lawful override
-        if (field_id and 'lawful' in field_id.lower()) or (tooltip and 'lawful' in tooltip.lower()):
-            if persona == 'applicant':
-                return 'personal'
-            if persona in ['attorney', 'preparer']:
-                return 'office'
-        # Inadmissibility override
-        if (field_id and 'inadmissibility' in field_id.lower()) or (tooltip and 'inadmissibility' in tooltip.lower()):
-            return 'criminal'
-        # Lawful Permanent Resident override
-        if (field_id and (('lawful permanent resident' in field_id.lower()) or ('lpr' in field_id.lower()))) or \
-           (tooltip and (('lawful permanent resident' in tooltip.lower()) or ('lpr' in tooltip.lower()))):
-            return 'personal'
-        # Address/Street override (never medical)
-        if (field_id and (('address' in field_id.lower()) or ('street' in field_id.lower()))) or \
-           (tooltip and (('address' in tooltip.lower()) or ('street' in tooltip.lower()))):
-            return 'personal'
-        
-        # Skip domain assignment for form structure fields
-        if self._is_form_structure_field(field_id):
-            return None
-            
-        # If persona is preparer or field is a form structure field, default to office
-        if persona == 'preparer' or self._is_form_structure_field(field_id):
-            return 'office'
-            
-        # Check field ID and tooltip against domain patterns
-        for domain, patterns in DOMAIN_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, field_id, re.IGNORECASE):
-                    # Don't assign office domain unless it's explicitly an office field and persona is preparer
-                    if domain == 'office' and persona != 'preparer':
-                        continue
-                    return domain
-                if tooltip and re.search(pattern, tooltip, re.IGNORECASE):
-                    if domain == 'office' and persona != 'preparer':
-                        continue
-                    return domain
-        
-        # For non-preparer personas, default to personal domain instead of office
-        if persona != 'preparer':
-            return 'personal'
-        
-        return 'office'
+        return _extract_domain_cached(field_id, tooltip, persona)
 
     def _extract_screen_label(self, tooltip: str, domain: str = None) -> str:
         """Extract screen label from tooltip's last sentence, or last two for criminal domain."""
-        if not tooltip:
-            return None
-        sentences = re.split('[.!?]\s+', tooltip.strip())
-        sentences = [s for s in sentences if s.strip()]
-        if not sentences:
-            return None
-        if domain == 'criminal' and len(sentences) >= 2:
-            return '. '.join(sentences[-2:]).strip()
-        # Remove common instruction prefixes from the last sentence
-        last_sentence = sentences[-1]
-        prefixes = [
-            'Enter', 'Select', 'Type', 'Choose', 'Provide', 'Indicate',
-            'Check', 'Fill in', 'Write', 'Specify'
-        ]
-        for prefix in prefixes:
-            pattern = f'^{prefix}\s+'
-            last_sentence = re.sub(pattern, '', last_sentence, flags=re.IGNORECASE)
-        return last_sentence.strip() or None
+        return _extract_screen_label_cached(tooltip, domain)
 
     def _extract_text_value(self, field_id: str) -> str:
         match = re.search(r'_([^_\[]+)\[\d+\]$', field_id)
@@ -410,8 +523,7 @@ class FormFieldAnalyzer:
         }
         # Try to extract last two sentences from tooltip
         if tooltip:
-            sentences = re.split(r'[.!?]\s+', tooltip.strip())
-            sentences = [s for s in sentences if s.strip()]
+            sentences = [s.strip() for s in _SENT_FINDALL.findall(tooltip.strip()) if s.strip()]
             if len(sentences) >= 2:
                 value_info['value'] = '. '.join(sentences[-2:]).strip()
             elif sentences:
@@ -425,59 +537,64 @@ class FormFieldAnalyzer:
 
     def extract_field_data(self, field, page_num=None) -> dict:
         """Extract all relevant data from a field"""
+        parent_name = None
+        parent_type = None
+        if '/Parent' in field:
+            parent = field['/Parent']
+            if '/T' in parent:
+                parent_name = parent['/T']
+                parent_type = parent.get('/FT', 'Unknown')
+        return self._build_field_data(field['/T'], field.get('/TU', None),
+                                      field.get('/FT', 'Unknown'),
+                                      parent_name, parent_type, page_num)
+
+    def _build_field_data(self, name, tooltip, ftype, parent_name, parent_type, page_num) -> dict:
+        """Classify one already-resolved widget record into a field dict."""
         data = {
-            'name': field['/T'],
+            'name': name,
             'page': page_num,
-            'type': field.get('/FT', 'Unknown'),
+            'type': ftype,
             'persona': None,
             'domain': None,
             'value_info': None,
             'screen_label': None,
-            'tooltip': None,  # Store the raw tooltip
-            'hierarchy': {
-                'parent_name': None,
-                'parent_type': None,
+            'tooltip': tooltip,  # Store the raw tooltip
+            # Most widgets have no parent; leave hierarchy as None for them
+            # instead of allocating an empty dict and child list each.
+            'hierarchy': None
+        }
+        if parent_name is not None:
+            data['hierarchy'] = {
+                'parent_name': parent_name,
+                'parent_type': parent_type,
                 'children': []
             }
-        }
-        
-        # Extract parent field information
-        if '/Parent' in field:
-            parent = field['/Parent']
-            if '/T' in parent:
-                parent_name = parent['/T']
-                data['hierarchy']['parent_name'] = parent_name
-                data['hierarchy']['parent_type'] = parent.get('/FT', 'Unknown')
-                
-        # Extract tooltip if available
-        tooltip = field.get('/TU', None)
-        data['tooltip'] = tooltip
-        
+
         # Extract screen label from tooltip's last sentence
         if tooltip:
             data['screen_label'] = self._extract_screen_label(tooltip, data['domain'])
-        
+
         # Extract persona
-        data['persona'] = self._extract_persona(data['name'], tooltip)
-        
+        data['persona'] = self._extract_persona(name, tooltip)
+
         # Extract domain (now passing persona)
-        data['domain'] = self._extract_domain(data['name'], tooltip, data['persona'])
-        
+        data['domain'] = self._extract_domain(name, tooltip, data['persona'])
+
         # Extract value info for buttons/checkboxes
-        if data['type'] == '/Btn':
-            data['value_info'] = self._extract_btn_value(data['name'], tooltip)
-            
+        if ftype == '/Btn':
+            data['value_info'] = self._extract_btn_value(name, tooltip)
+
             # If no screen label but we have a value, use it as screen label
             if not data['screen_label'] and data['value_info']['value']:
                 if isinstance(data['value_info']['value'], bool):
                     data['screen_label'] = 'Yes' if data['value_info']['value'] else 'No'
                 else:
                     data['screen_label'] = str(data['value_info']['value'])
-        elif data['type'] == '/Tx':
-            parsed_value = self._extract_text_value(data['name'])
+        elif ftype == '/Tx':
+            parsed_value = self._extract_text_value(name)
             if parsed_value:
                 data['value_info'] = {"type": "text", "value": parsed_value}
-            
+
         return data
 
     def extract_document_metadata(self, pdf_reader) -> dict:
@@ -503,29 +620,37 @@ class FormFieldAnalyzer:
         try:
             outline_list = pdf_reader.outline
             if outline_list:
-                for item in outline_list:
-                    if isinstance(item, list):
-                        # Handle nested outlines
-                        outlines.extend(self._process_outline_item(item))
-                    else:
-                        outlines.append(self._process_outline_item(item))
+                outlines = self._process_outline_list(outline_list)
         except Exception as e:
             logger.warning(f"Could not extract outline data: {e}")
         return outlines
 
-    def _process_outline_item(self, item) -> dict:
+    def _process_outline_list(self, items) -> list:
+        """Flatten a (possibly nested) outline list into a list of node dicts."""
+        flat = []
+        for item in items:
+            if isinstance(item, list):
+                flat.extend(self._process_outline_list(item))
+            else:
+                flat.append(self._process_outline_node(item))
+        return flat
+
+    def _process_outline_node(self, item) -> dict:
         """Process a single outline/bookmark item with detailed properties."""
-        if isinstance(item, list):
-            return [self._process_outline_item(i) for i in item]
-        
         outline_data = {}
         try:
-            # Basic properties
-            if hasattr(item, '/Title'):
+            # Basic properties -- direct key access beats hasattr, which has
+            # to go through getattr machinery on PyPDF2 objects (and never
+            # matched the '/Title' item keys anyway).
+            try:
                 outline_data['title'] = str(item['/Title'])
-            if hasattr(item, '/Dest'):
+            except (KeyError, TypeError):
+                pass
+            try:
                 outline_data['destination'] = str(item['/Dest'])
-            
+            except (KeyError, TypeError):
+                pass
+
             # Action and destination details
             if '/A' in item:
                 action = item['/A']
@@ -640,20 +765,44 @@ class FormFieldAnalyzer:
         logger.info(f"Starting analysis of form: {form_path}")
         try:
             reader = PdfReader(form_path)
-            form_fields = {}
+            # Pass 1: resolve every widget annotation exactly once into a
+            # flat record. PyPDF2 resolves an IndirectObject on each
+            # get_object()/__getitem__, so batching the raw reads here keeps
+            # each dereference to a single occurrence.
+            widgets = []
             for page_num, page in enumerate(reader.pages):
-                if '/Annots' in page:
-                    annotations = page['/Annots']
-                    if annotations is not None:
-                        for annotation in annotations:
-                            if annotation.get_object()['/Subtype'] == '/Widget':
-                                field = annotation.get_object()
-                                if '/T' in field:
-                                    field_name = field['/T']
-                                    field_data = self.extract_field_data(field, page_num)
-                                    # Add form name to each field record
-                                    field_data['form'] = form_name if form_name else os.path.basename(form_path)
-                                    form_fields[field_name] = field_data
+                if '/Annots' not in page:
+                    continue
+                annotations = page['/Annots']
+                if annotations is None:
+                    continue
+                for annotation in annotations:
+                    widget = annotation.get_object()
+                    if widget.get('/Subtype') != '/Widget':
+                        continue
+                    name = widget.get('/T')
+                    if name is None:
+                        continue
+                    parent_name = None
+                    parent_type = None
+                    parent = widget.get('/Parent')
+                    if parent is not None:
+                        parent = parent.get_object() # .get() hands back the raw IndirectObject
+                        if '/T' in parent:
+                            parent_name = parent['/T']
+                            parent_type = parent.get('/FT', 'Unknown')
+                    widgets.append((name, widget.get('/TU'), widget.get('/FT', 'Unknown'),
+                                    parent_name, parent_type, page_num))
+
+            # Pass 2: classify the batch, far from the PDF object graph.
+            form_label = form_name if form_name else os.path.basename(form_path)
+            form_fields = {}
+            for name, tooltip, ftype, parent_name, parent_type, page_num in widgets:
+                field_data = self._build_field_data(name, tooltip, ftype,
+                                                    parent_name, parent_type, page_num)
+                # Add form name to each field record
+                field_data['form'] = form_label
+                form_fields[name] = field_data
             return form_fields
         except Exception as e:
             logger.error(f"Error analyzing form {form_path}: {str(e)}")
@@ -662,14 +811,22 @@ class FormFieldAnalyzer:
     def analyze_all_forms(self, forms_dir: str) -> Dict:
         """Analyze all PDF forms in the specified directory"""
         logger.info("Starting analysis of all forms...")
-        all_forms_data = {}
-        for form_file in os.listdir(forms_dir):
-            if form_file.endswith('.pdf'):
-                logger.info(f"Analyzing form: {form_file}")
-                form_path = os.path.join(forms_dir, form_file)
-                form_data = self.analyze_form(form_path, form_name=form_file)
-                all_forms_data[form_file] = form_data
-        return all_forms_data
+        # Fresh caches per run so a stale classification never leaks between
+        # analyses if the pattern tables are edited in-process.
+        _extract_persona_cached.cache_clear()
+        _extract_domain_cached.cache_clear()
+        _extract_screen_label_cached.cache_clear()
+        form_files = [f for f in os.listdir(forms_dir) if f.endswith('.pdf')]
+        form_paths = [os.path.join(forms_dir, f) for f in form_files]
+        if len(form_files) <= 1:
+            return {form_file: self.analyze_form(form_path, form_name=form_file)
+                    for form_file, form_path in zip(form_files, form_paths)}
+        # Each form's analysis is independent and CPU-bound in PyPDF2 plus
+        # regex work, so fan out one process per form; the compiled pattern
+        # tables are module globals and get built once per worker import.
+        with ProcessPoolExecutor(max_workers=min(4, len(form_files))) as executor:
+            results = list(executor.map(_analyze_one_form, zip(form_paths, form_files)))
+        return dict(zip(form_files, results))
 
     def generate_field_listing(self, all_forms_data):
         """Generate a consolidated listing of all fields with relationship and persona information."""
@@ -689,18 +846,22 @@ class FormFieldAnalyzer:
                 if relationships:
                     relationships_data[form_name] = relationships
         
+        # Encode once and write once; json.dump with indent issues many tiny
+        # writes per node.
         with open(relationships_file, 'w') as f:
-            json.dump(relationships_data, f, indent=2)
+            f.write(json.dumps(relationships_data, indent=2))
         logger.info(f"Field relationships saved to: {relationships_file}")
         
-        # Generate basic field listing with persona information
-        with open(output_file, 'w') as f:
-            f.write("field_name,form,type,readonly,required,page,personas,has_parent,has_children,needs_persona_review\n")
-            
+        # Generate basic field listing with persona information. A single
+        # generator pass resolves hierarchy once per field, yields the CSV
+        # row straight into csv.writer's C writerows loop, and collects the
+        # review entries on the side -- no intermediate row list.
+        def iter_rows():
             for form_name, form_data in all_forms_data.items():
                 for field in form_data['fields']:
-                    has_parent = 'parent_name' in field.get('hierarchy', {})
-                    has_children = bool(field.get('hierarchy', {}).get('children', []))
+                    hierarchy = field.get('hierarchy') or {}
+                    has_parent = 'parent_name' in hierarchy
+                    has_children = bool(hierarchy.get('children', []))
                     personas = ';'.join(field.get('personas', []))
                     needs_persona_review = field.get('needs_persona_review', False)
                     
@@ -709,21 +870,32 @@ class FormFieldAnalyzer:
                             'form': form_name,
                             'field': field['name'],
                             'tooltip': field.get('tooltip', ''),
-                            'parent': field.get('hierarchy', {}).get('parent_name', '')
+                            'parent': hierarchy.get('parent_name', '')
                         })
                     
-                    f.write(f"{field['name']},{form_name},{field['type']},{field['readonly']},{field['required']},{field['page']},{personas},{has_parent},{has_children},{needs_persona_review}\n")
+                    yield (field['name'], form_name, field['type'], field['readonly'],
+                           field['required'], field['page'], personas, has_parent,
+                           has_children, needs_persona_review)
+        
+        with open(output_file, 'w', newline='', buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            writer.writerow(['field_name', 'form', 'type', 'readonly', 'required', 'page',
+                             'personas', 'has_parent', 'has_children', 'needs_persona_review'])
+            writer.writerows(iter_rows())
         
-        # Generate list of fields needing persona review
-        with open(persona_review_file, 'w') as f:
-            f.write("Fields Needing Persona Review\n")
-            f.write("=" * 50 + "\n\n")
-            for field in needs_review:
-                f.write(f"Form: {field['form']}\n")
-                f.write(f"Field: {field['field']}\n")
-                f.write(f"Tooltip: {field['tooltip']}\n")
-                f.write(f"Parent Field: {field['parent']}\n")
-                f.write("-" * 50 + "\n\n")
+        # Generate list of fields needing persona review, again as one
+        # accumulated write instead of five per entry. The separators are
+        # built once, not per entry.
+        entry_sep = "-" * 50 + "\n\n"
+        lines = ["Fields Needing Persona Review\n", "=" * 50 + "\n\n"]
+        for field in needs_review:
+            lines.append(f"Form: {field['form']}\n"
+                         f"Field: {field['field']}\n"
+                         f"Tooltip: {field['tooltip']}\n"
+                         f"Parent Field: {field['parent']}\n"
+                         f"{entry_sep}")
+        with open(persona_review_file, 'w', buffering=1 << 20) as f:
+            f.write(''.join(lines))
         
         logger.info(f"Field listing saved to: {output_file}")
         logger.info(f"Fields needing persona review saved to: {persona_review_file}")
@@ -739,22 +911,40 @@ def main():
     all_fields_flat = []
     for form_data in all_forms_data.values():
         all_fields_flat.extend(list(form_data.values()))
-    # Post-process:
-    for field in all_fields_flat:
-        # 1. If domain == 'medical' and value == 'name', set value = screen_label
-        if field.get('domain') == 'medical' and field.get('value_info', {}).get('value', '').lower() == 'name':
-            if field.get('screen_label'):
-                field['value_info']['value'] = field['screen_label']
-        # 2. If domain == 'personal' and persona is None, set persona = 'applicant'
-        if field.get('domain') == 'personal' and not field.get('persona'):
-            field['persona'] = 'applicant'
-        # 3. Existing rules: domain == 'medical' or value == 'AlienNumber' => persona = 'applicant'
-        if field.get('domain') == 'medical':
-            field['persona'] = 'applicant'
-        if field.get('value_info') and field['value_info'].get('value') == 'AlienNumber':
-            field['persona'] = 'applicant'
-    with open(output_file, "w") as f:
-        json.dump(all_fields_flat, f, indent=2)
+    # Post-process with vectorized masks over the relevant columns instead
+    # of a per-field Python loop; the masks index back into the original
+    # dicts, so nothing is lost converting nested fields through a frame.
+    import pandas as pd
+    df = pd.DataFrame({
+        'domain': [field.get('domain') for field in all_fields_flat],
+        'persona': [field.get('persona') for field in all_fields_flat],
+        'screen_label': [field.get('screen_label') for field in all_fields_flat],
+        'value': [(field.get('value_info') or {}).get('value') for field in all_fields_flat],
+    })
+    medical = df['domain'] == 'medical'
+    # 1. If domain == 'medical' and value == 'name', set value = screen_label
+    value_is_name = df['value'].map(lambda v: isinstance(v, str) and v.lower() == 'name')
+    has_label = df['screen_label'].notna() & (df['screen_label'] != '')
+    for i in (medical & value_is_name & has_label).to_numpy().nonzero()[0]:
+        field = all_fields_flat[i]
+        field['value_info']['value'] = field['screen_label']
+    # 2. If domain == 'personal' and persona is None, set persona = 'applicant'
+    needs_applicant = (df['domain'] == 'personal') & (df['persona'].isna() | (df['persona'] == ''))
+    # 3. Existing rules: domain == 'medical' or value == 'AlienNumber' => persona = 'applicant'
+    needs_applicant |= medical | (df['value'] == 'AlienNumber')
+    for i in needs_applicant.to_numpy().nonzero()[0]:
+        all_fields_flat[i]['persona'] = 'applicant'
+    # Stream the array one encoded field per line instead of materializing
+    # the whole document as a single string; orjson when available. The file
+    # stays a plain JSON array, so json.load consumers are unaffected.
+    with open(output_file, "wb", buffering=1 << 20) as f:
+        f.write(b"[\n")
+        for i, field in enumerate(all_fields_flat):
+            if i:
+                f.write(b",\n")
+            f.write(orjson.dumps(field) if orjson is not None
+                    else json.dumps(field).encode("utf-8"))
+        f.write(b"\n]\n")
     print(f"Value-mapped analysis saved to: {output_file}")
 
 if __name__ == "__main__":
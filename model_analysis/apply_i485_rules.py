@@ -6,10 +6,17 @@ Script to apply I-485 form rules (both existing and documented) to extracted fie
 
 import os
 import json
+import functools
 import logging
 import re
+from collections import Counter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from datetime import datetime
-from typing import Dict, List, Set, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,8 +25,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def _strip_dotstar(pattern: str) -> str:
+    """Drop redundant leading/trailing .* from a pattern used with search().
+
+    The wrappers add nothing to an unanchored boolean match but force the
+    backtracking engine to grow and shrink a greedy .* at every start
+    position; without them the scan is a straight literal-prefix hunt.
+    """
+    if pattern.startswith('.*'):
+        pattern = pattern[2:]
+    if pattern.endswith('.*'):
+        pattern = pattern[:-2]
+    return pattern
+
+
 class I485RuleApplicator:
     def __init__(self):
+        # Shared compile pool: the legacy lists repeat several patterns
+        # (personal info vs. the 'personal' domain, immigration ids, ...);
+        # each unique (pattern, flags) pair compiles exactly once and the
+        # lists share the compiled object.
+        self._pattern_pool = {}
+
+        def _pooled(pattern, flags=0):
+            key = (pattern, flags)
+            compiled = self._pattern_pool.get(key)
+            if compiled is None:
+                compiled = self._pattern_pool[key] = re.compile(pattern, flags)
+            return compiled
+
         # Import existing rules from analyze_form_fields.py
         self.form_part_mappings = {
             'i485.pdf': {
@@ -36,8 +71,11 @@ class I485RuleApplicator:
             }
         }
         
-        # Form structure fields that don't need personas
-        self.form_structure_patterns = [
+        # Form structure fields that don't need personas. All pattern lists
+        # are compiled once here: the rule passes run dozens of patterns per
+        # field over hundreds of fields, so per-call re.search(str, ...)
+        # cache lookups dominate otherwise.
+        self.form_structure_patterns = [_pooled(p) for p in [
             r'^#subform\[\d+\]$',
             r'^#pageSet\[\d+\]$', 
             r'^#area\[\d+\]$',
@@ -45,10 +83,10 @@ class I485RuleApplicator:
             r'^Page\d+\[\d+\]$',
             r'^PDF417BarCode2\[\d+\]$',
             r'^sfTable\[\d+\]$'
-        ]
+        ]]
 
         # Personal information field patterns that indicate applicant
-        self.personal_info_patterns = [
+        self.personal_info_patterns = [_pooled(p, re.IGNORECASE) for p in [
             r'.*(?:Family|Given|Middle)(?:Name)?.*',  # Match any name field
             r'.*(?:DOB|DateOfBirth|BirthDate).*',
             r'.*(?:BirthPlace|PlaceOfBirth).*',
@@ -61,16 +99,16 @@ class I485RuleApplicator:
             r'.*(?:MailingAddress|PhysicalAddress).*',
             r'.*(?:DaytimePhone|MobilePhone|EmailAddress).*',
             r'.*(?:Pt2Line4|Pt2Line11).*'  # Common personal info fields in Part 2
-        ]
+        ]]
 
         # Medical examination field patterns that indicate applicant
-        self.medical_patterns = [
+        self.medical_patterns = [_pooled(p) for p in [
             r'^Pt\d+Line\d+_(Medical|Health|Exam|Vaccine|Test|Treatment|Diagnosis|Doctor|Physician)',
             r'CompleteSeries',
             r'Immunization',
             r'MedicalExam',
             r'HealthScreening'
-        ]
+        ]]
 
         # Domain/category patterns for field classification
         self.domain_patterns = {
@@ -122,6 +160,8 @@ class I485RuleApplicator:
                 r'.*(?:Preparer|Attorney|Representative).*'
             ]
         }
+        self.domain_patterns = {domain: [_pooled(p, re.IGNORECASE) for p in patterns]
+                                for domain, patterns in self.domain_patterns.items()}
         
         # Enhanced rules based on our documentation
         self.enhanced_rules = {
@@ -219,83 +259,106 @@ class I485RuleApplicator:
                 }
             }
         }
+        # The office-section patterns run against already-lowercased text, so
+        # they compile without flags; the part patterns keep IGNORECASE.
+        office = self.enhanced_rules['office_section']
+        office['patterns'] = [_pooled(p) for p in office['patterns']]
+        # Resolve the office-section assignment once; the pass then runs
+        # without any per-call dict lookups into enhanced_rules.
+        self._office_persona = office['persona']
+        self._office_domain = office['domain']
+        for group_name in ('part1_patterns', 'part2_patterns', 'part3_patterns', 'part4_patterns'):
+            for rules in self.enhanced_rules[group_name].values():
+                rules['patterns'] = [_pooled(p, re.IGNORECASE) for p in rules['patterns']]
+
+        # Fuse each group of patterns into a single alternation so one regex
+        # call per group replaces a Python-level loop over the individual
+        # patterns. The boolean checks need no groups; the part rules tag
+        # each alternative with a uniquely-suffixed named group so
+        # m.lastgroup identifies which rule matched.
+        self.form_structure_regex = re.compile(
+            '|'.join(f'(?:{p.pattern})' for p in self.form_structure_patterns))
+        self.personal_info_regex = re.compile(
+            '|'.join(f'(?:{_strip_dotstar(p.pattern)})' for p in self.personal_info_patterns),
+            re.IGNORECASE)
+        self.medical_regex = re.compile(
+            '|'.join(f'(?:{p.pattern})' for p in self.medical_patterns))
+        self.domain_regexes = {
+            domain: re.compile('|'.join(f'(?:{_strip_dotstar(p.pattern)})' for p in patterns),
+                               re.IGNORECASE)
+            for domain, patterns in self.domain_patterns.items()}
+        self.office_section_regex = re.compile(
+            '|'.join(f'(?:{p.pattern})' for p in office['patterns']))
+        # Dispatch table for the part rules: (prefix, fused regex, fused
+        # group id -> rule name, rule group). One loop over this list
+        # replaces four copies of the same match-and-assign block.
+        self._part_rule_groups = []
+        for group_name in ('part1_patterns', 'part2_patterns', 'part3_patterns', 'part4_patterns'):
+            alternatives = []
+            rule_names = {}
+            for rule_name, rules in self.enhanced_rules[group_name].items():
+                for i, pattern in enumerate(rules['patterns']):
+                    group_id = f'{rule_name}_{i}'
+                    rule_names[group_id] = rule_name
+                    alternatives.append(f'(?P<{group_id}>{pattern.pattern})')
+            self._part_rule_groups.append((group_name.split('_')[0],
+                                           re.compile('|'.join(alternatives), re.IGNORECASE),
+                                           rule_names,
+                                           self.enhanced_rules[group_name]))
+
+        # Ad-hoc patterns used by the pattern-identification and part-lookup
+        # helpers, compiled once as well.
+        self.part_number_pattern = re.compile(r'Pt(\d+)')
+        self.dual_checkbox_pattern = re.compile(r'(male|female)', re.IGNORECASE)
+        self.yes_no_pattern = re.compile(r'(yes|no)', re.IGNORECASE)
+        self.character_sequence_pattern = re.compile(r'(ssn|alien.*number)', re.IGNORECASE)
+        self.complex_option_pattern = re.compile(r'(apt|ste|flr)', re.IGNORECASE)
+
+        # Field names repeat heavily across pages and subforms, so the pure
+        # classifiers are memoized per instance: a cache hit is one C-level
+        # dict lookup instead of a fused regex scan.
+        self._is_form_structure_field = functools.lru_cache(maxsize=8192)(self._is_form_structure_field)
+        self._is_personal_info_field = functools.lru_cache(maxsize=8192)(self._is_personal_info_field)
+        self._is_medical_field = functools.lru_cache(maxsize=8192)(self._is_medical_field)
+        self._classify_domain = functools.lru_cache(maxsize=8192)(self._classify_domain)
 
-    def _get_form_part_persona(self, field_id: str) -> str:
+    def _get_form_part_persona(self, field_id: str) -> Optional[str]:
         """Determine persona based on form part number from field ID."""
-        part_match = re.match(r'Pt(\d+)', field_id)
+        part_match = self.part_number_pattern.match(field_id)
         if not part_match:
             return None
             
         part_num = f"Pt{part_match.group(1)}"
         return self.form_part_mappings.get('i485.pdf', {}).get(part_num)
 
-    def _apply_office_section_rules(self, field: Dict) -> Dict:
+    def _apply_office_section_rules(self, field: Dict[str, Any], name_lc: str, tooltip_lc: str) -> Dict[str, Any]:
         """Apply office section rules (pre-Part 1)"""
-        field_name = field.get('name', '').lower()
-        tooltip = field.get('tooltip', '').lower() if field.get('tooltip') else ''
-        
-        for pattern in self.enhanced_rules['office_section']['patterns']:
-            if re.search(pattern, field_name) or re.search(pattern, tooltip):
-                field['persona'] = self.enhanced_rules['office_section']['persona']
-                field['domain'] = self.enhanced_rules['office_section']['domain']
-                field['collection_type'] = 'one_to_one'
-                field['rule_applied'] = 'office_section'
-                return field
+        if self.office_section_regex.search(name_lc) or self.office_section_regex.search(tooltip_lc):
+            field['persona'] = self._office_persona
+            field['domain'] = self._office_domain
+            field['collection_type'] = 'one_to_one'
+            field['rule_applied'] = 'office_section'
         return field
 
-    def _apply_part_specific_rules(self, field: Dict) -> Dict:
+    def _apply_part_specific_rules(self, field: Dict[str, Any], field_name: str) -> Dict[str, Any]:
         """Apply part-specific rules based on field patterns"""
-        field_name = field.get('name', '')
-        
-        # Check Part 1 patterns
-        for pattern_name, rules in self.enhanced_rules['part1_patterns'].items():
-            for pattern in rules['patterns']:
-                if re.search(pattern, field_name, re.IGNORECASE):
-                    field['persona'] = rules['persona']
-                    field['domain'] = rules['domain']
-                    field['collection_type'] = rules.get('collection_type', 'standard')
-                    field['rule_applied'] = f'part1_{pattern_name}'
-                    return field
-        
-        # Check Part 2 patterns
-        for pattern_name, rules in self.enhanced_rules['part2_patterns'].items():
-            for pattern in rules['patterns']:
-                if re.search(pattern, field_name, re.IGNORECASE):
-                    field['persona'] = rules['persona']
-                    field['domain'] = rules['domain']
-                    field['collection_type'] = rules.get('collection_type', 'standard')
-                    field['rule_applied'] = f'part2_{pattern_name}'
-                    return field
-        
-        # Check Part 3 patterns
-        for pattern_name, rules in self.enhanced_rules['part3_patterns'].items():
-            for pattern in rules['patterns']:
-                if re.search(pattern, field_name, re.IGNORECASE):
-                    field['persona'] = rules['persona']
-                    field['domain'] = rules['domain']
-                    field['collection_type'] = rules.get('collection_type', 'standard')
-                    field['rule_applied'] = f'part3_{pattern_name}'
-                    return field
-        
-        # Check Part 4 patterns
-        for pattern_name, rules in self.enhanced_rules['part4_patterns'].items():
-            for pattern in rules['patterns']:
-                if re.search(pattern, field_name, re.IGNORECASE):
-                    field['persona'] = rules['persona']
-                    field['domain'] = rules['domain'] 
-                    field['collection_type'] = rules.get('collection_type', 'standard')
-                    field['rule_applied'] = f'part4_{pattern_name}'
-                    return field
+        for prefix, regex, rule_names, group in self._part_rule_groups:
+            m = regex.search(field_name)
+            if m:
+                rule_name = rule_names[m.lastgroup]
+                rules = group[rule_name]
+                field['persona'] = rules['persona']
+                field['domain'] = rules['domain']
+                field['collection_type'] = rules.get('collection_type', 'standard')
+                field['rule_applied'] = f'{prefix}_{rule_name}'
+                return field
         
         return field
 
-    def _apply_legacy_rules(self, field: Dict) -> Dict:
+    def _apply_legacy_rules(self, field: Dict[str, Any], field_name: str, tooltip: str) -> Dict[str, Any]:
         """Apply legacy rules from analyze_form_fields.py as fallback"""
         if field.get('persona') and field.get('domain'):
             return field  # Already assigned by enhanced rules
-            
-        field_name = field.get('name', '')
-        tooltip = field.get('tooltip', '') if field.get('tooltip') else ''
         
         # Skip form structure fields
         if self._is_form_structure_field(field_name):
@@ -323,7 +386,7 @@ class I485RuleApplicator:
         
         # Apply comprehensive domain patterns
         if not field.get('domain'):
-            field['domain'] = self._apply_domain_patterns(field)
+            field['domain'] = self._classify_domain(field_name, tooltip)
             if not field.get('rule_applied'):
                 field['rule_applied'] = 'domain_pattern'
         
@@ -334,51 +397,65 @@ class I485RuleApplicator:
                 
         return field
 
-    def _identify_field_patterns(self, field: Dict) -> Dict:
+    def _identify_field_patterns(self, field: Dict[str, Any], field_name: str, tooltip_lc: str) -> Dict[str, Any]:
         """Identify special field patterns and collection strategies"""
-        field_name = field.get('name', '')
-        tooltip = field.get('tooltip', '') if field.get('tooltip') else ''
-        
         # Dual checkbox pattern (Male/Female)
-        if re.search(r'(male|female)', field_name, re.IGNORECASE) and field.get('type') == '/Btn':
+        if self.dual_checkbox_pattern.search(field_name) and field.get('type') == '/Btn':
             field['pattern_type'] = 'dual_checkbox'
             field['pattern_description'] = 'Either/or selection with separate checkboxes'
             
         # Yes/No button pattern
-        elif re.search(r'(yes|no)', field_name, re.IGNORECASE) and field.get('type') == '/Btn':
+        elif self.yes_no_pattern.search(field_name) and field.get('type') == '/Btn':
             field['pattern_type'] = 'yes_no_button'
             field['pattern_description'] = 'Standard yes/no selection'
             
         # Character-by-character fields (SSN, Alien Number)
-        elif re.search(r'(ssn|alien.*number)', field_name, re.IGNORECASE) and '_' in field_name:
+        elif self.character_sequence_pattern.search(field_name) and '_' in field_name:
             field['pattern_type'] = 'character_sequence'
             field['pattern_description'] = 'Individual character input boxes'
             
         # Checkbox + text combination
-        elif 'checkbox' in tooltip.lower() and 'text' in tooltip.lower():
+        elif 'checkbox' in tooltip_lc and 'text' in tooltip_lc:
             field['pattern_type'] = 'checkbox_text_combo'
             field['pattern_description'] = 'Linked checkbox and text area'
             
         # Complex option pattern (Apt/Ste/Flr)
-        elif re.search(r'(apt|ste|flr)', field_name, re.IGNORECASE):
+        elif self.complex_option_pattern.search(field_name):
             field['pattern_type'] = 'complex_option'
             field['pattern_description'] = 'Multiple checkboxes with conditional text'
             
         return field
 
-    def apply_rules_to_field(self, field: Dict) -> Dict:
+    def apply_rules_to_field(self, field: Dict[str, Any]) -> Dict[str, Any]:
         """Apply all rules to a single field"""
+        # Hoist the name/tooltip lookups and lowercase conversions once for
+        # the whole rule chain instead of repeating them in every pass.
+        name = field.get('name') or ''
+        tooltip = field.get('tooltip') or ''
+        name_lc = name.lower()
+        tooltip_lc = tooltip.lower()
+        
+        # 0. Structure fields (#subform[0], Page1[0], ...) can never match a
+        # content rule; settle them up front instead of running every pass.
+        if self._is_form_structure_field(name):
+            field['persona'] = None
+            field['domain'] = None
+            field['rule_applied'] = 'form_structure_skip'
+            if not field.get('collection_type'):
+                field['collection_type'] = 'standard'
+            return field
+        
         # 1. Apply office section rules first (highest priority)
-        field = self._apply_office_section_rules(field)
+        field = self._apply_office_section_rules(field, name_lc, tooltip_lc)
         
         # 2. Apply part-specific enhanced rules
-        field = self._apply_part_specific_rules(field)
+        field = self._apply_part_specific_rules(field, name)
         
         # 3. Apply legacy rules as fallback
-        field = self._apply_legacy_rules(field)
+        field = self._apply_legacy_rules(field, name, tooltip)
         
         # 4. Identify field patterns
-        field = self._identify_field_patterns(field)
+        field = self._identify_field_patterns(field, name, tooltip_lc)
         
         # 5. Set collection_type if not already set
         if not field.get('collection_type'):
@@ -386,17 +463,34 @@ class I485RuleApplicator:
             
         return field
 
-    def process_i485_fields(self, fields_file: str) -> Dict:
+    def process_i485_fields(self, fields_file: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """Process all extracted i485 fields with enhanced rules"""
         logger.info(f"Loading fields from: {fields_file}")
         
-        with open(fields_file, 'r') as f:
-            fields = json.load(f)
+        # orjson decodes several times faster than stdlib json; fall back
+        # when it isn't installed.
+        with open(fields_file, 'rb') as f:
+            raw = f.read()
+        fields = orjson.loads(raw) if orjson is not None else json.loads(raw)
         
         logger.info(f"Processing {len(fields)} fields with enhanced rules")
         
         processed_fields = {}
-        rule_stats = {}
+        rule_stats = Counter()
+        # Summary statistics accumulate in the same pass as rule
+        # application, so each field dict is touched exactly once.
+        stats = {
+            'personas': Counter(),
+            'domains': Counter(),
+            'collection_types': Counter(),
+            'patterns': Counter(),
+            'documented_vs_legacy': {
+                'documented_sections': 0,
+                'legacy_fallback': 0,
+                'form_structure': 0
+            }
+        }
+        documented_vs_legacy = stats['documented_vs_legacy']
         
         for field_name, field_data in fields.items():
             processed_field = self.apply_rules_to_field(field_data)
@@ -404,41 +498,56 @@ class I485RuleApplicator:
             
             # Track rule usage statistics
             rule_applied = processed_field.get('rule_applied', 'no_rule')
-            rule_stats[rule_applied] = rule_stats.get(rule_applied, 0) + 1
+            rule_stats[rule_applied] += 1
+            
+            stats['personas'][processed_field.get('persona') or 'None'] += 1
+            stats['domains'][processed_field.get('domain') or 'None'] += 1
+            stats['collection_types'][processed_field.get('collection_type') or 'None'] += 1
+            stats['patterns'][processed_field.get('pattern_type') or 'standard'] += 1
+            
+            # Categorize by our documented rules vs legacy
+            if rule_applied.startswith(('office_section', 'part1_', 'part2_', 'part3_', 'part4_')):
+                documented_vs_legacy['documented_sections'] += 1
+            elif rule_applied == 'form_structure_skip':
+                documented_vs_legacy['form_structure'] += 1
+            else:
+                documented_vs_legacy['legacy_fallback'] += 1
         
         logger.info("Rule application statistics:")
         for rule, count in sorted(rule_stats.items()):
             logger.info(f"  {rule}: {count} fields")
             
-        return processed_fields
+        return processed_fields, stats
 
     def _is_form_structure_field(self, field_id: str) -> bool:
         """Check if field is a form structure field that doesn't need a persona"""
-        return any(re.match(pattern, field_id) for pattern in self.form_structure_patterns)
+        return self.form_structure_regex.match(field_id) is not None
 
     def _is_personal_info_field(self, field_id: str) -> bool:
         """Check if field contains personal information about the applicant"""
-        return any(re.search(pattern, field_id, re.IGNORECASE) for pattern in self.personal_info_patterns)
+        return self.personal_info_regex.search(field_id) is not None
 
     def _is_medical_field(self, field_id: str) -> bool:
         """Check if field contains medical information about the applicant"""
-        return any(re.match(pattern, field_id) for pattern in self.medical_patterns)
+        return self.medical_regex.match(field_id) is not None
 
-    def _apply_domain_patterns(self, field: Dict) -> str:
+    def _apply_domain_patterns(self, field: Dict[str, Any]) -> str:
         """Apply domain patterns to determine field domain"""
         if field.get('domain'):
             return field['domain']  # Already set
             
         field_name = field.get('name', '')
         tooltip = field.get('tooltip', '') if field.get('tooltip') else ''
-        
-        # Check each domain pattern
-        for domain, patterns in self.domain_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, field_name, re.IGNORECASE):
-                    return domain
-                if tooltip and re.search(pattern, tooltip, re.IGNORECASE):
-                    return domain
+        return self._classify_domain(field_name, tooltip)
+
+    def _classify_domain(self, field_name: str, tooltip: str) -> str:
+        """Classify a name/tooltip pair against the fused domain patterns"""
+        # Check each domain's fused pattern, in priority order
+        for domain, pattern in self.domain_regexes.items():
+            if pattern.search(field_name):
+                return domain
+            if tooltip and pattern.search(tooltip):
+                return domain
         
         return 'personal'  # Default domain
 
@@ -447,58 +556,41 @@ def main():
     
     # Find the most recent extraction file
     extraction_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "i485_extraction")
-    extraction_files = [f for f in os.listdir(extraction_dir) if f.endswith('.json')]
-    if not extraction_files:
+    # max() finds the newest timestamped name in one linear pass; no need
+    # to sort the whole directory listing for its last element.
+    latest = max((f for f in os.listdir(extraction_dir) if f.endswith('.json')), default=None)
+    if latest is None:
         logger.error("No extraction files found. Run extract_i485_fields.py first.")
         return
     
-    latest_file = os.path.join(extraction_dir, sorted(extraction_files)[-1])
+    latest_file = os.path.join(extraction_dir, latest)
     logger.info(f"Using extraction file: {latest_file}")
     
-    # Process fields with rules
-    processed_fields = applicator.process_i485_fields(latest_file)
+    # Process fields with rules (summary stats accumulate in the same pass)
+    processed_fields, stats = applicator.process_i485_fields(latest_file)
     
     # Save processed results
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = os.path.join(extraction_dir, f"i485_with_rules_{timestamp}.json")
     
-    with open(output_file, 'w') as f:
-        json.dump(processed_fields, f, indent=2)
+    # Encode once and write once instead of json.dump's per-node writes;
+    # orjson when available, stdlib otherwise
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(processed_fields, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_file, 'w') as f:
+            f.write(json.dumps(processed_fields, indent=2))
     
     print(f"Processed fields saved to: {output_file}")
     print(f"Total fields processed: {len(processed_fields)}")
     
-    # Generate detailed analysis report
-    personas = {}
-    domains = {}
-    collection_types = {}
-    patterns = {}
-    documented_vs_legacy = {
-        'documented_sections': 0,
-        'legacy_fallback': 0,
-        'form_structure': 0
-    }
-    
-    for field in processed_fields.values():
-        # Filter out None values for sorting
-        persona = field.get('persona') or 'None'
-        domain = field.get('domain') or 'None'
-        collection_type = field.get('collection_type') or 'None'
-        pattern_type = field.get('pattern_type') or 'standard'
-        rule_applied = field.get('rule_applied', 'no_rule')
-        
-        personas[persona] = personas.get(persona, 0) + 1
-        domains[domain] = domains.get(domain, 0) + 1
-        collection_types[collection_type] = collection_types.get(collection_type, 0) + 1
-        patterns[pattern_type] = patterns.get(pattern_type, 0) + 1
-        
-        # Categorize by our documented rules vs legacy
-        if rule_applied.startswith(('office_section', 'part1_', 'part2_', 'part3_', 'part4_')):
-            documented_vs_legacy['documented_sections'] += 1
-        elif rule_applied == 'form_structure_skip':
-            documented_vs_legacy['form_structure'] += 1
-        else:
-            documented_vs_legacy['legacy_fallback'] += 1
+    # Detailed analysis report, from the stats gathered during processing
+    personas = stats['personas']
+    domains = stats['domains']
+    collection_types = stats['collection_types']
+    patterns = stats['patterns']
+    documented_vs_legacy = stats['documented_vs_legacy']
     
     print(f"\n=== RULE EFFECTIVENESS ANALYSIS ===")
     print(f"Documented Sections (Office, Parts 1-4): {documented_vs_legacy['documented_sections']} fields")
@@ -1,20 +1,171 @@
+import asyncio
+import functools
+import hashlib
 import os
+import sqlite3
 import sys
 import json
 import glob
 import time
 import re
 from datetime import datetime
+import httpx
+import ijson
 import openai
 
+from llm_parallel import process_requests
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
     print("ERROR: OPENAI_API_KEY environment variable is not set. Please set it and rerun the script.")
     sys.exit(1)
 openai.api_key = api_key
 
+# One client per API key, built lazily and reused by every call, so the
+# TLS handshake and connection pool are paid for once per process.
+@functools.lru_cache(maxsize=None)
+def _get_sync_client(key):
+    return openai.OpenAI(api_key=key, timeout=60.0)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_async_client(key):
+    # Enrichment is network-bound, so batches run concurrently up to the
+    # account's rate limits. The stock transport keeps a small keep-alive
+    # pool that degrades past ~20 concurrent requests, so the pool is
+    # sized to the dispatcher's ceiling up front.
+    return openai.AsyncOpenAI(
+        api_key=key,
+        http_client=httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        ),
+    )
+
+
+client = _get_async_client(api_key)
+
 RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
 BATCH_SIZE = 10
+# Per-field classification is keyword-driven labeling; gpt-4o-mini handles
+# it at a fraction of gpt-4-turbo's cost. The grouping pass, where
+# semantics actually matter, stays on gpt-4-turbo. Override for A/B runs
+# with the ENRICH_MODEL env var.
+ENRICH_MODEL = os.getenv("ENRICH_MODEL", "gpt-4o-mini")
+RPM_LIMIT = 3500
+TPM_LIMIT = 90000
+
+# Tooltips repeat heavily across forms and re-runs; classifications are
+# cached on disk so identical inputs never pay for a second API call.
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "enrich_cache.sqlite")
+
+
+@functools.lru_cache(maxsize=1)
+def _cache_db():
+    db = sqlite3.connect(CACHE_PATH)
+    db.execute("CREATE TABLE IF NOT EXISTS cache(k TEXT PRIMARY KEY, v TEXT)")
+    db.execute("CREATE TABLE IF NOT EXISTS semcache(tooltip TEXT PRIMARY KEY, v TEXT)")
+    return db
+
+
+def _cache_key(field, model):
+    payload = {
+        "form": field.get("form", ""),
+        "name": field.get("name", ""),
+        "tooltip": field.get("tooltip", ""),
+        "model": model,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+@functools.lru_cache(maxsize=100_000)
+def _cache_get(key):
+    row = _cache_db().execute("SELECT v FROM cache WHERE k = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _cache_put(key, result):
+    _cache_db().execute("INSERT OR REPLACE INTO cache(k, v) VALUES (?, ?)", (key, json.dumps(result)))
+    _cache_db().commit()
+
+
+# Near-duplicate tooltips ("Enter beneficiary's first name." vs
+# "Beneficiary's given name.") miss the exact-hash cache even though the
+# classification is the same. A second lookup compares normalized token
+# sets and reuses a prior answer when the Jaccard overlap clears a high
+# bar, so only genuinely new wording reaches the API.
+SEMANTIC_THRESHOLD = 0.92
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def _tooltip_tokens(tooltip):
+    return frozenset(_TOKEN_RE.findall((tooltip or "").lower()))
+
+
+@functools.lru_cache(maxsize=1)
+def _semantic_entries():
+    return [(_tooltip_tokens(tooltip), json.loads(v))
+            for tooltip, v in _cache_db().execute("SELECT tooltip, v FROM semcache")]
+
+
+def _semantic_lookup(tooltip):
+    tokens = _tooltip_tokens(tooltip)
+    if not tokens:
+        return None
+    best = None
+    best_score = SEMANTIC_THRESHOLD
+    for cached_tokens, result in _semantic_entries():
+        union = len(tokens | cached_tokens)
+        score = len(tokens & cached_tokens) / union if union else 0.0
+        if score >= best_score:
+            best, best_score = result, score
+    return best
+
+
+def _semantic_add(tooltip, result):
+    tokens = _tooltip_tokens(tooltip)
+    if not tokens:
+        return
+    _cache_db().execute("INSERT OR REPLACE INTO semcache(tooltip, v) VALUES (?, ?)",
+                        (tooltip, json.dumps(result)))
+    _semantic_entries().append((tokens, result))
+
+
+def apply_cached_enrichments(fields, model):
+    """Fill fields answered on a previous run; return the cache misses."""
+    misses = []
+    for field in fields:
+        cached = _cache_get(_cache_key(field, model))
+        if cached is None:
+            result = _semantic_lookup(field.get("tooltip"))
+            if result is None:
+                misses.append(field)
+                continue
+        else:
+            result = json.loads(cached)
+        field["llm_persona"] = result.get("persona")
+        field["llm_domain"] = result.get("domain")
+        field["react_label"] = result.get("react_label")
+    return misses
+
+
+def store_enrichments(fields, model):
+    """Cache successful classifications; failed batches stay uncached."""
+    for field in fields:
+        if field.get("llm_persona") is None and field.get("llm_domain") is None:
+            continue
+        result = {
+            "persona": field.get("llm_persona"),
+            "domain": field.get("llm_domain"),
+            "react_label": field.get("react_label"),
+        }
+        _cache_put(_cache_key(field, model), result)
+        _semantic_add(field.get("tooltip"), result)
 
 def get_latest_analysis_file():
     files = sorted(glob.glob(os.path.join(RESULTS_DIR, "run_*/complete_analysis_*.json")), reverse=True)
@@ -35,8 +186,83 @@ def is_label_only_tooltip(field):
         return True
     return False
 
-def build_batch_prompt(fields):
-    instructions = '''
+# The persona/domain rules from the prompt, in its priority order, so the
+# common deterministic cases never spend a GPT-4-turbo round-trip. The
+# "contains" checks mirror the prompt's wording; first hit wins.
+_PERSONA_RULES = [
+    ("beneficiary", ("beneficiary",)),
+    ("family_member", ("your child", "your children")),
+    ("spouse", ("spouse",)),
+    ("parent", ("father", "mother", "parent")),
+    ("preparer", ("preparer",)),
+    ("employer", ("employer",)),
+    ("interpreter", ("interpreter",)),
+    ("attorney", ("attorney",)),
+    ("physician", ("physician", "doctor", "civil surgeon")),
+    ("sponsor", ("sponsor",)),
+]
+
+_DOMAIN_RULES = [
+    ("personal", ("name", "date of birth", "place of birth", "social security",
+                  "address", "phone", "marital", "gender", "race")),
+    ("medical", ("medical", "health", "vaccine", "vaccination", "treatment",
+                 "diagnosis", "hospital", "disability", "immunization", "mental")),
+    ("criminal", ("criminal", "arrest", "conviction", "offense", "prison",
+                  "court", "police", "felony", "violation", "illegal")),
+    ("immigration", ("alien number", "i-94", "passport", "visa", "deportation",
+                     "asylum", "citizenship")),
+    ("office", ("receipt", "filing", "office", "signature", "fee",
+                "representative")),
+]
+
+
+def rule_classify(field):
+    """Apply the prompt's deterministic rules locally; None means the field
+    still needs the LLM.
+
+    Only fields where both a persona and a domain rule fire are classified
+    here. The prompt's judgment rules (bare "you"/"your", ambiguous
+    "family") are deliberately left to the model.
+    """
+    name = field.get("name") or ""
+    tooltip = field.get("tooltip") or ""
+    text = tooltip.lower()
+    if "pdf417barcode" in name.lower() or "pdf417barcode" in text:
+        return {"persona": "attorney", "domain": "office",
+                "react_label": field.get("screen_label") or "Barcode"}
+    persona = None
+    for rule_persona, needles in _PERSONA_RULES:
+        if any(needle in text for needle in needles):
+            persona = rule_persona
+            break
+    if persona is None and "applicant" in text:
+        persona = "applicant"
+    if persona is None:
+        return None
+    domain = None
+    for rule_domain, needles in _DOMAIN_RULES:
+        if any(needle in text for needle in needles):
+            domain = rule_domain
+            break
+    # Overrides, same order as the prompt.
+    if persona in ("preparer", "attorney"):
+        domain = "office"
+    elif "inadmissibility" in text:
+        domain = "criminal"
+    elif "address" in text or "street" in text:
+        domain = "personal"
+    elif "lawful" in text and persona == "applicant":
+        domain = "personal"
+    if domain is None:
+        return None
+    return {"persona": persona, "domain": domain,
+            "react_label": field.get("screen_label") or field.get("name")}
+
+
+# Sent verbatim as the system message on every request. Keeping this
+# block byte-identical across batches lets the provider's prompt cache
+# serve it at a discount instead of re-billing ~600 tokens per batch.
+SYSTEM_PROMPT = '''
 You are an expert in immigration form field classification. For each field, use the tooltip as the primary source to determine:
 - persona: Who does this field apply to? (choose the closest match from: applicant, beneficiary, spouse, parent, preparer, attorney, employer, interpreter, family_member, physician, sponsor; if unsure, pick the most likely based on the tooltip and context, and if truly ambiguous, default to 'applicant')
 - domain: What type of data is this? (e.g., personal, medical, criminal, immigration, office, etc.)
@@ -77,50 +303,106 @@ Rules:
 - Medical questions often ask about vaccines, doctor clearances, or dates.
 - The same field label (like "Name") may apply to different personas in different sections or forms.
 - If the tooltip is ambiguous, use the form part or section if available.
-- Respond with a JSON array, one object per field, in the same order as the input.
+- Input fields are given as [form, name, tooltip] triples.
+- Respond with a JSON object of the form {"fields": [...]}, one object per field, in the same order as the input.
 - Each object must have: persona, domain, react_label.
 
 Examples:
-1. {"form": "i485.pdf", "name": "Pt9Line2_InterpreterGivenName[0]", "type": "/Tx", "tooltip": "Interpreter's Given Name. Enter the interpreter's first name."}
+1. ["i485.pdf", "Pt9Line2_InterpreterGivenName[0]", "Interpreter's Given Name. Enter the interpreter's first name."]
    Output: {"persona": "interpreter", "domain": "office", "react_label": "Interpreter's First Name"}
-2. {"form": "i693.pdf", "name": "Pt4Line5_VaccineDate[0]", "type": "/Tx", "tooltip": "Date of last tetanus vaccine. Enter the date."}
+2. ["i693.pdf", "Pt4Line5_VaccineDate[0]", "Date of last tetanus vaccine. Enter the date."]
    Output: {"persona": "applicant", "domain": "medical", "react_label": "Date of Last Tetanus Vaccine"}
-3. {"form": "i130.pdf", "name": "Pt2Line10_PreviousEmployer[0]", "type": "/Tx", "tooltip": "Previous employer's name. Enter the name of your previous employer."}
+3. ["i130.pdf", "Pt2Line10_PreviousEmployer[0]", "Previous employer's name. Enter the name of your previous employer."]
    Output: {"persona": "applicant", "domain": "personal", "react_label": "Previous Employer Name"}
-4. {"form": "i485.pdf", "name": "PDF417BarCode1[0]", "type": "/Tx", "tooltip": "PDF417BarCode1"}
+4. ["i485.pdf", "PDF417BarCode1[0]", "PDF417BarCode1"]
    Output: {"persona": "attorney", "domain": "office", "react_label": "Barcode"}
-5. {"form": "i693.pdf", "name": "Pt4Line5_VaccineDate[0]", "type": "/Tx", "tooltip": "This is a read only field. This field pre-populates from page 2."}
+5. ["i693.pdf", "Pt4Line5_VaccineDate[0]", "This is a read only field. This field pre-populates from page 2."]
    Output: {"persona": "applicant", "domain": "medical", "react_label": "Pre-populated Vaccine Date"}
 '''
-    # Build the input array
-    field_jsons = []
-    for field in fields:
-        field_jsons.append({
-            "form": field.get("form", ""),
-            "name": field.get("name", ""),
-            "type": field.get("type", ""),
-            "tooltip": field.get("tooltip", "")
-        })
-    prompt = f"{instructions}\nInput fields:\n{json.dumps(field_jsons, ensure_ascii=False)}\n\nRespond with a JSON array of objects, one per field, in the same order."
-    return prompt
 
-def enrich_fields_with_llm_batch(fields, model="gpt-4-turbo"):
+# Strict structured output: the response is guaranteed to parse and match
+# this shape, so fence-stripping and decode retries never fire on the
+# happy path. Strict mode requires an object root, so the per-field array
+# rides under a "fields" key.
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "fields": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "persona": {
+                        "type": "string",
+                        "enum": ["applicant", "beneficiary", "spouse", "parent",
+                                 "preparer", "attorney", "employer", "interpreter",
+                                 "family_member", "family", "physician", "sponsor"],
+                    },
+                    "domain": {"type": "string"},
+                    "react_label": {"type": "string"},
+                },
+                "required": ["persona", "domain", "react_label"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["fields"],
+    "additionalProperties": False,
+}
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "fields", "schema": RESPONSE_SCHEMA, "strict": True},
+}
+
+
+def build_batch_prompt(fields):
+    """Build the per-batch user message: [form, name, tooltip] triples.
+
+    The instructions live in SYSTEM_PROMPT so only this part varies
+    between requests. The terse positional form (no keys, no whitespace,
+    no unused type) roughly halves the user-turn token count.
+    """
+    triples = [[field.get("form", ""), field.get("name", ""), field.get("tooltip", "")]
+               for field in fields]
+    return f"Input fields:\n{json.dumps(triples, ensure_ascii=False, separators=(',', ':'))}"
+
+def _extract_json_array(text):
+    """Parse a JSON array out of an LLM response, tolerating markdown
+    fences and surrounding prose before giving up."""
+    text = re.sub(r"^```(?:json)?\s*", "", text.strip())
+    text = re.sub(r"\s*```\s*$", "", text)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        match = re.search(r"\[.*\]", text, re.S)
+        if match is None:
+            raise
+        return json.loads(match.group(0))
+
+async def enrich_fields_with_llm_batch_async(client, fields, model=ENRICH_MODEL):
     prompt = build_batch_prompt(fields)
     print(f"Batch prompt for fields {fields[0].get('name')} ... {fields[-1].get('name')}")
     try:
-        response = openai.chat.completions.create(
-            model=model,
-            messages=[{"role": "system", "content": "You are a helpful assistant."},
-                      {"role": "user", "content": prompt}],
-            max_tokens=2000,
-            temperature=0.2,
-        )
+        for attempt in range(3):
+            try:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "system", "content": SYSTEM_PROMPT},
+                              {"role": "user", "content": prompt}],
+                    max_tokens=2000,
+                    temperature=0.2,
+                    response_format=RESPONSE_FORMAT,
+                )
+                break
+            except (openai.RateLimitError, openai.APIError) as e:
+                if attempt == 2:
+                    raise
+                print(f"Retryable API error for batch (attempt {attempt + 1}): {e}")
+                await asyncio.sleep(2 ** attempt)
         content = response.choices[0].message.content
         print(f"Raw LLM batch response: {content[:500]}...\n")
         try:
-            results = json.loads(content)
-            if not isinstance(results, list) or len(results) != len(fields):
-                raise ValueError("LLM batch response is not a list of correct length.")
+            results = json.loads(content)["fields"]
             for field, result in zip(fields, results):
                 field["llm_persona"] = result.get("persona")
                 field["llm_domain"] = result.get("domain")
@@ -139,6 +421,95 @@ def enrich_fields_with_llm_batch(fields, model="gpt-4-turbo"):
             field["react_label"] = None
     return fields
 
+async def enrich_all_fields(fields, model=ENRICH_MODEL):
+    """Enrich fields in BATCH_SIZE chunks, throttled to the rate limits."""
+    misses = apply_cached_enrichments(fields, model)
+    print(f"{len(fields) - len(misses)} fields served from cache, {len(misses)} to classify.")
+    batches = [misses[i:i + BATCH_SIZE] for i in range(0, len(misses), BATCH_SIZE)]
+    # Rough token estimate: ~4 chars/token for the prompt, plus the
+    # completion allowance; good enough to stay under the TPM budget.
+    requests = [{"fields": batch,
+                 "token_estimate": (len(SYSTEM_PROMPT) + len(build_batch_prompt(batch))) // 4 + 2000}
+                for batch in batches]
+
+    async def handler(request):
+        return await enrich_fields_with_llm_batch_async(client, request["fields"], model)
+
+    await process_requests(requests, handler, rpm=RPM_LIMIT, tpm=TPM_LIMIT)
+    store_enrichments(misses, model)
+    return fields
+
+def enrich_with_batch_api(fields, model=ENRICH_MODEL, poll_interval=60):
+    """Enrich fields through the OpenAI Batch API.
+
+    The overnight backfill is latency-insensitive, so it runs at the Batch
+    API's half price and relaxed throughput limits: upload one chat request
+    per BATCH_SIZE group as JSONL, poll until the batch completes, then map
+    results back to fields by custom_id.
+    """
+    sync = _get_sync_client(api_key)
+    misses = apply_cached_enrichments(fields, model)
+    print(f"{len(fields) - len(misses)} fields served from cache, {len(misses)} to classify.")
+    batches = [misses[i:i + BATCH_SIZE] for i in range(0, len(misses), BATCH_SIZE)]
+    if not batches:
+        return fields
+    lines = []
+    for idx, batch in enumerate(batches):
+        lines.append(json.dumps({
+            "custom_id": str(idx),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": [{"role": "system", "content": SYSTEM_PROMPT},
+                             {"role": "user", "content": build_batch_prompt(batch)}],
+                "max_tokens": 2000,
+                "temperature": 0.2,
+                "response_format": RESPONSE_FORMAT,
+            },
+        }))
+    # Requests that never come back (batch errors) keep the null default.
+    for field in misses:
+        field["llm_persona"] = None
+        field["llm_domain"] = None
+        field["react_label"] = None
+
+    batch_input = sync.files.create(
+        file=("requests.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    job = sync.batches.create(
+        input_file_id=batch_input.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"Submitted batch {job.id} with {len(batches)} requests; polling every {poll_interval}s...")
+    while job.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_interval)
+        job = sync.batches.retrieve(job.id)
+    if job.status != "completed" or not job.output_file_id:
+        print(f"Batch {job.id} finished with status {job.status}; no results to apply.")
+        return fields
+
+    output = sync.files.content(job.output_file_id).text
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        batch = batches[int(entry["custom_id"])]
+        try:
+            content = entry["response"]["body"]["choices"][0]["message"]["content"]
+            results = json.loads(content)["fields"]
+        except Exception as e:
+            print(f"Bad batch result for request {entry.get('custom_id')}: {e}")
+            continue
+        for field, result in zip(batch, results):
+            field["llm_persona"] = result.get("persona")
+            field["llm_domain"] = result.get("domain")
+            field["react_label"] = result.get("react_label")
+    store_enrichments(misses, model)
+    return fields
+
 def build_collection_prompt(fields):
     instructions = '''
 You are an expert in data modeling for immigration forms. Given the following list of form fields (with persona, domain, value, tooltip, etc.), group them into canonical collection fields. For each collection field, specify:
@@ -175,17 +546,29 @@ def group_fields_with_llm(fields, model="gpt-4-turbo"):
     prompt = build_collection_prompt(fields)
     print(f"Sending {len(fields)} fields to LLM for collection field grouping...")
     try:
-        response = openai.chat.completions.create(
+        # Streaming means work (and progress output) starts at first token
+        # instead of blocking until the full 4000-token response lands.
+        response = _get_sync_client(api_key).chat.completions.create(
             model=model,
             messages=[{"role": "system", "content": "You are a helpful assistant."},
                       {"role": "user", "content": prompt}],
             max_tokens=4000,
             temperature=0.2,
+            stream=True,
         )
-        content = response.choices[0].message.content
-        print(f"Raw LLM response (first 1000 chars): {content[:1000]}\n...")
+        parts = []
+        streamed = 0
+        for chunk in response:
+            delta = chunk.choices[0].delta.content or ""
+            if delta:
+                parts.append(delta)
+                streamed += len(delta)
+                if streamed <= 1000:
+                    print(delta, end="", flush=True)
+        print("\n...")
+        content = "".join(parts)
         try:
-            results = json.loads(content)
+            results = _extract_json_array(content)
             return results
         except Exception as e:
             print(f"JSON decode error for collection fields: {e}")
@@ -200,10 +583,42 @@ def main():
         print("No value_mapping_*.json file found.")
         return
     print(f"Reading: {latest_file}")
-    with open(latest_file, "r") as f:
-        all_fields = json.load(f)
-    # Only use fields with non-null persona and value
-    filtered_fields = [f for f in all_fields if f.get("persona") and (f.get("value_info") or {}).get("value")]
+    # Stream-parse rather than json.load: only fields that pass the
+    # persona/value filter are ever resident, not the whole file.
+    with open(latest_file, "rb") as f:
+        filtered_fields = [
+            field for field in ijson.items(f, "item")
+            if field.get("persona") and (field.get("value_info") or {}).get("value")
+        ]
+    # Label-only tooltips carry no signal worth a prompt; they get a cheap
+    # default. Deterministic rule hits are assigned locally. Only the rest
+    # pay for an API call.
+    llm_misses = []
+    label_only = 0
+    for field in filtered_fields:
+        if is_label_only_tooltip(field):
+            field["llm_persona"] = "applicant"
+            field["llm_domain"] = "office"
+            field["react_label"] = field.get("screen_label") or "Field"
+            label_only += 1
+            continue
+        result = rule_classify(field)
+        if result is None:
+            llm_misses.append(field)
+        else:
+            field["llm_persona"] = result["persona"]
+            field["llm_domain"] = result["domain"]
+            field["react_label"] = result["react_label"]
+    rule_hits = len(filtered_fields) - label_only - len(llm_misses)
+    print(f"{label_only} label-only fields defaulted, {rule_hits} classified by rules; {len(llm_misses)} need the LLM.")
+    # The Batch API is the default (half price, higher throughput); pass
+    # --sync for an interactive run that streams results back in minutes.
+    if "--sync" in sys.argv:
+        print(f"Enriching {len(llm_misses)} fields with LLM in batches of {BATCH_SIZE}...")
+        asyncio.run(enrich_all_fields(llm_misses))
+    else:
+        print(f"Enriching {len(llm_misses)} fields via the Batch API in groups of {BATCH_SIZE}...")
+        enrich_with_batch_api(llm_misses)
     print(f"Grouping {len(filtered_fields)} fields into collection fields with LLM...")
     if len(filtered_fields) > 2000:
         print("WARNING: Too many fields for a single LLM call. Consider splitting the data.")
@@ -212,8 +627,11 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     out_file = os.path.join(os.path.dirname(latest_file), f"collection_fields_{timestamp}.json")
     if collection_fields:
-        with open(out_file, "w") as f:
-            json.dump(collection_fields, f, indent=2)
+        with open(out_file, "wb") as f:
+            if orjson is not None:
+                f.write(orjson.dumps(collection_fields, option=orjson.OPT_INDENT_2))
+            else:
+                f.write(json.dumps(collection_fields, indent=2).encode("utf-8"))
         print(f"Wrote collection fields to: {out_file}")
     else:
         print("No collection fields output.")
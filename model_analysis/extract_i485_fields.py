@@ -4,6 +4,8 @@
 Script to extract field data specifically from i485.pdf for rule testing.
 """
 
+import concurrent.futures
+import io
 import os
 import json
 import logging
@@ -11,6 +13,11 @@ from datetime import datetime
 from PyPDF2 import PdfReader
 import re
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -18,16 +25,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Compiled once; the extraction loop runs these over every field of a form.
+SENT_SPLIT = re.compile(r'[.!?]\s+')
+# One pattern covers both 'Pt2Line10_State[0]' and the bare '..._State' form.
+TAIL_VALUE = re.compile(r'_([^_\[]+)(?:\[\d+\])?$')
+PREFIX_STRIP = re.compile(
+    r'^(?:Enter|Select|Type|Choose|Provide|Indicate|Check|Fill in|Write|Specify)\s+',
+    re.IGNORECASE
+)
+
 class I485FieldExtractor:
-    def __init__(self):
+    def __init__(self, form_path=None):
         self.forms_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'uscis_forms'))
-        self.i485_path = os.path.join(self.forms_dir, 'i485.pdf')
+        self.i485_path = form_path or os.path.join(self.forms_dir, 'i485.pdf')
+        self.form_name = os.path.basename(self.i485_path)
         
     def _extract_screen_label(self, tooltip: str, field_type: str = None) -> str:
         """Extract screen label from tooltip - last two sentences for buttons, last sentence for text."""
         if not tooltip:
             return None
-        sentences = re.split(r'[.!?]\s+', tooltip.strip())
+        sentences = SENT_SPLIT.split(tooltip.strip())
         sentences = [s for s in sentences if s.strip()]
         if not sentences:
             return None
@@ -40,25 +57,14 @@ class I485FieldExtractor:
             screen_label = sentences[-1].strip()
         
         # Remove common instruction prefixes
-        prefixes = [
-            'Enter', 'Select', 'Type', 'Choose', 'Provide', 'Indicate',
-            'Check', 'Fill in', 'Write', 'Specify'
-        ]
-        for prefix in prefixes:
-            pattern = f'^{prefix}\\s+'
-            screen_label = re.sub(pattern, '', screen_label, flags=re.IGNORECASE)
+        screen_label = PREFIX_STRIP.sub('', screen_label, count=1)
         
         return screen_label.strip() or None
 
     def _extract_text_value(self, field_id: str) -> str:
         """Extract value from field name like 'Pt2Line10_State[0]' -> 'State'"""
-        # Match pattern like _ValueName[0] at the end
-        match = re.search(r'_([^_\[]+)\[\d+\]$', field_id)
-        if match:
-            return match.group(1)
-        
-        # Fallback: try to extract after last underscore before bracket
-        match = re.search(r'_([^_]+)$', field_id.split('[')[0])
+        # Match pattern like _ValueName[0] (or a bare _ValueName) at the end
+        match = TAIL_VALUE.search(field_id)
         if match:
             return match.group(1)
             
@@ -70,29 +76,21 @@ class I485FieldExtractor:
             'value': None
         }
         
-        # First try to extract value from field name (like _Yes[0] or _Male[0])
-        match = re.search(r'_([^_\[]+)\[\d+\]$', field_id)
+        # First try to extract value from field name (like _Yes[0], _Male[0]
+        # or a bare _Yes); one pattern covers the bracketed and plain forms.
+        match = TAIL_VALUE.search(field_id)
         if match:
             value_info['value'] = match.group(1)
         
         # If we have tooltip and no value yet, try to extract from tooltip
         if not value_info['value'] and tooltip:
-            sentences = re.split(r'[.!?]\s+', tooltip.strip())
+            sentences = SENT_SPLIT.split(tooltip.strip())
             sentences = [s for s in sentences if s.strip()]
             if len(sentences) >= 2:
                 value_info['value'] = '. '.join(sentences[-2:]).strip()
             elif sentences:
                 value_info['value'] = sentences[-1].strip()
         
-        # If still no value, try fallback patterns from field name
-        if not value_info['value']:
-            # Try to extract after last underscore
-            parts = field_id.split('_')
-            if len(parts) > 1:
-                last_part = parts[-1].split('[')[0]  # Remove [0] suffix
-                if last_part:
-                    value_info['value'] = last_part
-                    
         return value_info
 
     def extract_field_data(self, field, page_num=None) -> dict:
@@ -111,7 +109,7 @@ class I485FieldExtractor:
                 'parent_type': None,
                 'children': []
             },
-            'form': 'i485.pdf'
+            'form': self.form_name
         }
         
         # Extract parent field information
@@ -159,21 +157,48 @@ class I485FieldExtractor:
             return {}
             
         try:
-            reader = PdfReader(self.i485_path)
+            # Lazy indirect-object resolution does thousands of tiny
+            # seek/read pairs; one up-front read keeps them all in memory.
+            with open(self.i485_path, 'rb') as fh:
+                reader = PdfReader(io.BytesIO(fh.read()))
             fields = {}
-            
+
+            # One cheap pass over the page annotations maps each widget's
+            # object id to its page number; the field walk below never
+            # touches the pages again.
+            page_by_ref = {}
             for page_num, page in enumerate(reader.pages):
                 if '/Annots' in page:
                     annotations = page['/Annots']
                     if annotations is not None:
                         for annotation in annotations:
-                            if annotation.get_object()['/Subtype'] == '/Widget':
-                                field = annotation.get_object()
-                                if '/T' in field:
-                                    field_name = field['/T']
-                                    field_data = self.extract_field_data(field, page_num)
-                                    fields[field_name] = field_data
-            
+                            page_by_ref[annotation.idnum] = page_num
+
+            # The AcroForm /Fields tree is the authoritative field list;
+            # walking it resolves each field object exactly once instead of
+            # re-resolving every page annotation.
+            acro_form = reader.trailer['/Root'].get('/AcroForm')
+            if acro_form is not None:
+                acro_form = acro_form.get_object()
+            if acro_form is None or '/Fields' not in acro_form:
+                logger.error(f"No AcroForm field tree in {self.i485_path}")
+                return {}
+
+            def walk(nodes):
+                for node in nodes:
+                    obj = node.get_object()
+                    kids = obj.get('/Kids')
+                    if kids:
+                        yield from walk(kids)
+                    else:
+                        yield node, obj
+
+            for ref, field in walk(acro_form['/Fields']):
+                if '/T' in field:
+                    field_name = field['/T']
+                    page_num = page_by_ref.get(getattr(ref, 'idnum', None))
+                    fields[field_name] = self.extract_field_data(field, page_num)
+
             logger.info(f"Extracted {len(fields)} fields from i485.pdf")
             return fields
             
@@ -181,21 +206,44 @@ class I485FieldExtractor:
             logger.error(f"Error extracting fields from {self.i485_path}: {str(e)}")
             return {}
 
+def extract_form(form_path: str) -> dict:
+    """Extract fields from a single form; module-level so worker processes
+    can pickle it."""
+    extractor = I485FieldExtractor(form_path)
+    return extractor.extract_i485_fields()
+
 def main():
-    extractor = I485FieldExtractor()
-    fields = extractor.extract_i485_fields()
+    forms_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'uscis_forms'))
+    form_paths = [os.path.join(forms_dir, 'i485.pdf')]
     
-    # Save to timestamped file
+    # Extraction is CPU-bound (PDF object walk plus regex), so multiple
+    # forms fan out across worker processes; a single form runs in-process
+    # to skip the pool spin-up.
+    if len(form_paths) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = dict(zip(form_paths, executor.map(extract_form, form_paths)))
+    else:
+        results = {form_paths[0]: extract_form(form_paths[0])}
+    
+    # Save to timestamped files
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "i485_extraction")
     os.makedirs(output_dir, exist_ok=True)
-    output_file = os.path.join(output_dir, f"i485_fields_{timestamp}.json")
-    
-    with open(output_file, "w") as f:
-        json.dump(fields, f, indent=2)
-    
-    print(f"I-485 fields extracted to: {output_file}")
-    print(f"Total fields: {len(fields)}")
+    for form_path, fields in results.items():
+        stem = os.path.splitext(os.path.basename(form_path))[0]
+        output_file = os.path.join(output_dir, f"{stem}_fields_{timestamp}.json")
+        
+        # orjson serializes several times faster than stdlib even when
+        # pretty-printing; fall back to json if it is unavailable.
+        # OPT_NON_STR_KEYS handles PyPDF2's str-subclass field names.
+        with open(output_file, "wb") as f:
+            if orjson is not None:
+                f.write(orjson.dumps(fields, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                f.write(json.dumps(fields, indent=2).encode("utf-8"))
+        
+        print(f"{os.path.basename(form_path)} fields extracted to: {output_file}")
+        print(f"Total fields: {len(fields)}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,6 +1,5 @@
 import json
 import pandas as pd
-from collections import Counter
 
 # Set the input file here
 INPUT_FILE = "model_analysis/results/run_20250603_143812/enriched_analysis_20250603_205126_fixed_value_info.json"
@@ -10,49 +9,39 @@ OUTPUT_XLSX = INPUT_FILE.replace('.json', '.xlsx')
 with open(INPUT_FILE, 'r') as f:
     fields = json.load(f)
 
-# Prepare data for unique (persona, domain, value) combinations
-combos = []
-rows = []
-for field in fields:
-    persona = field.get('llm_persona') or field.get('persona')
-    domain = field.get('llm_domain') or field.get('domain')
-    value = None
-    if isinstance(field.get('value_info'), dict):
-        value = field['value_info'].get('value')
-    name = field.get('name')
-    tooltip = field.get('tooltip')
-    form = field.get('form')
-    combos.append((persona, domain, value))
-    rows.append({
-        'persona': persona,
-        'domain': domain,
-        'value': value,
-        'name': name,
-        'tooltip': tooltip,
-        'form': form
-    })
-
-# Count unique combinations
-combo_counter = Counter(combos)
-unique_combos = list(combo_counter.keys())
-print(f"Total unique (persona, domain, value) combinations: {len(unique_combos)}\n")
-for combo, count in combo_counter.most_common():
-    print(f"{combo}: {count}")
+# One flat DataFrame up front; every derivation below is a columnar pass
+# instead of a per-field Python loop.
+df = pd.json_normalize(fields)
+
+
+def _coalesce(primary, fallback):
+    """Columnar `field.get(primary) or field.get(fallback)`: empty strings
+    fall through to the fallback, not just nulls."""
+    llm = df[primary] if primary in df.columns else pd.Series(None, index=df.index, dtype=object)
+    base = df[fallback] if fallback in df.columns else pd.Series(None, index=df.index, dtype=object)
+    return llm.where(llm.notna() & (llm != ''), base)
+
+
+summary = pd.DataFrame({
+    'persona': _coalesce('llm_persona', 'persona'),
+    'domain': _coalesce('llm_domain', 'domain'),
+    'value': df.get('value_info.value'),
+    'tooltip': df.get('tooltip'),
+    'form': df.get('form'),
+    'screen_label': df.get('screen_label'),
+    'name': df.get('name'),
+})
+
+# Count unique combinations. sort=False keeps first-seen order so the
+# stable descending sort ties break the same way Counter.most_common does.
+combo_counts = summary.groupby(['persona', 'domain', 'value'], dropna=False, sort=False).size()
+combo_counts = combo_counts.sort_values(ascending=False, kind='stable')
+print(f"Total unique (persona, domain, value) combinations: {len(combo_counts)}\n")
+for combo, count in combo_counts.items():
+    print(f"{tuple(None if pd.isna(part) else part for part in combo)}: {count}")
 
 # Write Excel file
 print(f"Writing Excel file to {OUTPUT_XLSX} ...")
-df = pd.DataFrame([
-    {
-        'persona': row['persona'],
-        'domain': row['domain'],
-        'value': row['value'],
-        'tooltip': row['tooltip'],
-        'form': row['form'],
-        'screen_label': fields[i].get('screen_label'),
-        'name': row['name']
-    }
-    for i, row in enumerate(rows)
-])
-df = df.sort_values(by=['persona', 'domain', 'value'], na_position='last')
-df.to_excel(OUTPUT_XLSX, index=False)
-print("Done.") 
\ No newline at end of file
+summary = summary.sort_values(by=['persona', 'domain', 'value'], na_position='last')
+summary.to_excel(OUTPUT_XLSX, index=False)
+print("Done.")
@@ -1,24 +1,41 @@
 import json
 import re
 
+import ijson
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 INPUT_FILE = "model_analysis/results/run_20250603_143812/enriched_analysis_20250603_205126.json"
 OUTPUT_FILE = INPUT_FILE.replace('.json', '_fixed_value_info.json')
 
-with open(INPUT_FILE, 'r') as f:
-    fields = json.load(f)
+# Matches the value after the last underscore and before the bracket;
+# compiled once rather than per record.
+TAIL_VALUE = re.compile(r'_([^_\[]+)\[\d+\]$')
 
+# Stream record by record: the input parses incrementally and each patched
+# record is written straight out, one per line, so peak memory is a single
+# record instead of two full copies of the file.
 updated_count = 0
-for field in fields:
-    if field.get('value_info') is None:
-        name = field.get('name', '')
-        # Match the value after the last underscore and before the bracket
-        match = re.search(r'_([^_\[]+)\[\d+\]$', name)
-        if match:
-            value = match.group(1)
-            field['value_info'] = {"type": "selection", "value": value}
-            updated_count += 1
+with open(INPUT_FILE, 'rb') as inp, open(OUTPUT_FILE, 'wb', buffering=1 << 20) as out:
+    out.write(b'[\n')
+    first = True
+    for field in ijson.items(inp, 'item', use_float=True):
+        if field.get('value_info') is None:
+            match = TAIL_VALUE.search(field.get('name', ''))
+            if match:
+                field['value_info'] = {"type": "selection", "value": match.group(1)}
+                updated_count += 1
+        if not first:
+            out.write(b',\n')
+        if orjson is not None:
+            out.write(orjson.dumps(field))
+        else:
+            out.write(json.dumps(field).encode('utf-8'))
+        first = False
+    out.write(b'\n]\n')
 
 print(f"Updated value_info for {updated_count} records.")
-with open(OUTPUT_FILE, 'w') as f:
-    json.dump(fields, f, indent=2)
-print(f"Wrote updated file to: {OUTPUT_FILE}") 
\ No newline at end of file
+print(f"Wrote updated file to: {OUTPUT_FILE}")
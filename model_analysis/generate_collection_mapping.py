@@ -4,9 +4,18 @@
 Generate collection field mappings from analyzed i485 fields.
 """
 
+import functools
 import os
 import json
 import logging
+import re
+
+import ijson
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from datetime import datetime
 from collections import defaultdict
 
@@ -17,85 +26,113 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Hoisted out of the per-field loops: one fused alternation for the
+# address components, and the previous-name line tags in check order.
+_ADDR_RE = re.compile(r'Address|Street|City|State|ZIP')
+_PREVIOUS_NAME_SLOTS = (
+    ('Line2', 'previous_name_1'),
+    ('Line3', 'previous_name_2'),
+    ('Line4', 'previous_name_3'),
+)
+# Key schema for one-to-one entries, shared by every field so the dict
+# is assembled with one zip instead of a fresh 7-key literal per field.
+_ONE_TO_ONE_KEYS = ('type', 'description', 'persona', 'domain', 'form_fields',
+                    'screen_label', 'value_type')
+_PERSONA_PREFIX = {
+    'applicant': 'Applicant',
+    'attorney': 'Attorney',
+    'family_member': 'Family',
+    'beneficiary': 'Beneficiary',
+    'preparer': 'Preparer',
+    'interpreter': 'Interpreter'
+}
+_DOMAIN_SUFFIX = {
+    'immigration': '_Immigration',
+    'medical': '_Medical',
+    'criminal': '_Criminal',
+    'office': '_Office'
+}
+
+@functools.lru_cache(maxsize=None)
+def generate_collection_name(base_name: str, collection_type: str, persona: str, domain: str) -> str:
+    """Generate a standardized collection field name"""
+    # Pure function of its arguments; repeated (persona, domain) pairs hit
+    # the cache instead of re-running the replace chain.
+    # Clean up base name
+    clean_base = base_name.replace('Name', '').replace('Address', '').strip()
+    
+    # Add persona prefix for clarity, and domain context if needed; both
+    # are single table probes instead of a dict literal and an elif chain.
+    persona_prefix = _PERSONA_PREFIX.get(persona, 'Unknown')
+    domain_suffix = _DOMAIN_SUFFIX.get(domain, '')
+    
+    return f"{persona_prefix}_{clean_base}{domain_suffix}"
+
 class CollectionFieldMapper:
+    # The instance only ever holds the mappings dict; slots skip the
+    # per-instance __dict__ and speed up the attribute hits in the loops.
+    __slots__ = ('collection_mappings',)
+
     def __init__(self):
         self.collection_mappings = {}
         
-    def generate_collection_name(self, base_name: str, collection_type: str, persona: str, domain: str) -> str:
-        """Generate a standardized collection field name"""
-        # Clean up base name
-        clean_base = base_name.replace('Name', '').replace('Address', '').strip()
-        
-        # Add persona prefix for clarity
-        persona_prefix = {
-            'applicant': 'Applicant',
-            'attorney': 'Attorney', 
-            'family_member': 'Family',
-            'beneficiary': 'Beneficiary',
-            'preparer': 'Preparer',
-            'interpreter': 'Interpreter'
-        }.get(persona, 'Unknown')
-        
-        # Add domain context if needed
-        domain_suffix = ''
-        if domain == 'immigration':
-            domain_suffix = '_Immigration'
-        elif domain == 'medical':
-            domain_suffix = '_Medical'
-        elif domain == 'criminal':
-            domain_suffix = '_Criminal'
-        elif domain == 'office':
-            domain_suffix = '_Office'
-            
-        return f"{persona_prefix}_{clean_base}{domain_suffix}"
-
     def process_one_to_many_fields(self, fields_by_type):
         """Process fields that map one collection field to many form fields"""
         logger.info("Processing one-to-many collection fields...")
         
-        # Group by logical collection (e.g., names, addresses)
-        name_fields = []
-        address_fields = []
-        other_fields = []
+        # One pass appends each field name straight into its component
+        # bucket instead of rebuilding and rescanning intermediate lists.
+        name_all, name_family, name_given, name_middle = [], [], [], []
+        addr_all, addr_street, addr_city, addr_state, addr_zip = [], [], [], [], []
         
-        for field_name, field_data in fields_by_type['one_to_many']:
+        for field_name, _ in fields_by_type['one_to_many']:
             if 'Name' in field_name:
-                name_fields.append((field_name, field_data))
-            elif any(addr in field_name for addr in ['Address', 'Street', 'City', 'State', 'ZIP']):
-                address_fields.append((field_name, field_data))
-            else:
-                other_fields.append((field_name, field_data))
+                name_all.append(field_name)
+                if 'Family' in field_name:
+                    name_family.append(field_name)
+                elif 'Given' in field_name:
+                    name_given.append(field_name)
+                elif 'Middle' in field_name:
+                    name_middle.append(field_name)
+            elif _ADDR_RE.search(field_name):
+                addr_all.append(field_name)
+                if 'Street' in field_name:
+                    addr_street.append(field_name)
+                elif 'City' in field_name:
+                    addr_city.append(field_name)
+                elif 'State' in field_name:
+                    addr_state.append(field_name)
+                elif 'ZIP' in field_name:
+                    addr_zip.append(field_name)
         
         # Create collection for current names
-        if name_fields:
-            collection_name = "Applicant_Current_Name"
-            self.collection_mappings[collection_name] = {
+        if name_all:
+            self.collection_mappings["Applicant_Current_Name"] = {
                 'type': 'one_to_many',
                 'description': 'Applicant current legal name (reused across forms)',
                 'persona': 'applicant',
                 'domain': 'personal',
-                'form_fields': [field[0] for field in name_fields],
+                'form_fields': name_all,
                 'components': {
-                    'family_name': [f for f in [field[0] for field in name_fields] if 'Family' in f],
-                    'given_name': [f for f in [field[0] for field in name_fields] if 'Given' in f], 
-                    'middle_name': [f for f in [field[0] for field in name_fields] if 'Middle' in f]
+                    'family_name': name_family,
+                    'given_name': name_given,
+                    'middle_name': name_middle
                 }
             }
             
         # Create collection for mailing address
-        if address_fields:
-            collection_name = "Applicant_Mailing_Address"
-            self.collection_mappings[collection_name] = {
+        if addr_all:
+            self.collection_mappings["Applicant_Mailing_Address"] = {
                 'type': 'one_to_many',
                 'description': 'Applicant mailing address (reused across forms)',
                 'persona': 'applicant',
                 'domain': 'personal',
-                'form_fields': [field[0] for field in address_fields],
+                'form_fields': addr_all,
                 'components': {
-                    'street': [f for f in [field[0] for field in address_fields] if 'Street' in f],
-                    'city': [f for f in [field[0] for field in address_fields] if 'City' in f],
-                    'state': [f for f in [field[0] for field in address_fields] if 'State' in f],
-                    'zip': [f for f in [field[0] for field in address_fields] if 'ZIP' in f]
+                    'street': addr_street,
+                    'city': addr_city,
+                    'state': addr_state,
+                    'zip': addr_zip
                 }
             }
 
@@ -103,33 +140,42 @@ class CollectionFieldMapper:
         """Process repeating fields (0-3 occurrences)"""
         logger.info("Processing repeating collection fields...")
         
-        # Group previous names by occurrence (2, 3, 4)
-        previous_name_groups = defaultdict(list)
+        # Group previous names by occurrence (2, 3, 4), classifying each
+        # field into its component bucket in the same pass so the mapping
+        # below never rescans the group lists.
+        previous_name_groups = defaultdict(
+            lambda: {'all': [], 'family_name': [], 'given_name': [], 'middle_name': []}
+        )
         
-        for field_name, field_data in fields_by_type['repeating']:
+        for field_name, _ in fields_by_type['repeating']:
             if 'Name' in field_name:
                 # Extract line number (2, 3, 4)
-                if 'Line2' in field_name:
-                    previous_name_groups['previous_name_1'].append((field_name, field_data))
-                elif 'Line3' in field_name:
-                    previous_name_groups['previous_name_2'].append((field_name, field_data))
-                elif 'Line4' in field_name:
-                    previous_name_groups['previous_name_3'].append((field_name, field_data))
+                for tag, group_key in _PREVIOUS_NAME_SLOTS:
+                    if tag in field_name:
+                        group = previous_name_groups[group_key]
+                        group['all'].append(field_name)
+                        if 'Family' in field_name:
+                            group['family_name'].append(field_name)
+                        elif 'Given' in field_name:
+                            group['given_name'].append(field_name)
+                        elif 'Middle' in field_name:
+                            group['middle_name'].append(field_name)
+                        break
         
         # Create collection for each previous name slot
-        for i, (group_key, fields) in enumerate(previous_name_groups.items(), 1):
+        for i, (group_key, group) in enumerate(previous_name_groups.items(), 1):
             collection_name = f"Applicant_Previous_Name_{i}"
             self.collection_mappings[collection_name] = {
                 'type': 'repeating',
                 'description': f'Applicant previous name #{i} (optional)',
                 'persona': 'applicant',
                 'domain': 'personal',
-                'form_fields': [field[0] for field in fields],
+                'form_fields': group['all'],
                 'occurrence': i,
                 'components': {
-                    'family_name': [f for f in [field[0] for field in fields] if 'Family' in f],
-                    'given_name': [f for f in [field[0] for field in fields] if 'Given' in f],
-                    'middle_name': [f for f in [field[0] for field in fields] if 'Middle' in f]
+                    'family_name': group['family_name'],
+                    'given_name': group['given_name'],
+                    'middle_name': group['middle_name']
                 }
             }
 
@@ -137,9 +183,10 @@ class CollectionFieldMapper:
         """Process one-to-one collection fields (mostly office/attorney)"""
         logger.info("Processing one-to-one collection fields...")
         
+        mappings = self.collection_mappings
         for field_name, field_data in fields_by_type['one_to_one']:
             # Create individual collection field for each
-            collection_name = self.generate_collection_name(
+            collection_name = generate_collection_name(
                 field_name.replace('[0]', ''), 
                 'one_to_one',
                 field_data.get('persona', 'unknown'),
@@ -150,24 +197,25 @@ class CollectionFieldMapper:
             value_info = field_data.get('value_info') or {}
             value_type = value_info.get('type', 'unknown') if isinstance(value_info, dict) else 'unknown'
             
-            self.collection_mappings[collection_name] = {
-                'type': 'one_to_one',
-                'description': f'Single field collection for {field_name}',
-                'persona': field_data.get('persona'),
-                'domain': field_data.get('domain'),
-                'form_fields': [field_name],
-                'screen_label': field_data.get('screen_label'),
-                'value_type': value_type
-            }
+            mappings[collection_name] = dict(zip(_ONE_TO_ONE_KEYS, (
+                'one_to_one',
+                f'Single field collection for {field_name}',
+                field_data.get('persona'),
+                field_data.get('domain'),
+                [field_name],
+                field_data.get('screen_label'),
+                value_type,
+            )))
 
     def process_grouped_checkboxes(self, fields_by_type):
         """Process grouped checkbox collections"""
         logger.info("Processing grouped checkbox collections...")
         
-        for field_name, field_data in fields_by_type['grouped_checkboxes']:
+        mappings = self.collection_mappings
+        for field_name, _ in fields_by_type['grouped_checkboxes']:
             collection_name = "Applicant_Immigration_Category"
-            if collection_name not in self.collection_mappings:
-                self.collection_mappings[collection_name] = {
+            if collection_name not in mappings:
+                mappings[collection_name] = {
                     'type': 'grouped_checkboxes',
                     'description': 'Immigration category selection (Part 2)',
                     'persona': 'applicant',
@@ -176,22 +224,21 @@ class CollectionFieldMapper:
                     'sub_categories': {}
                 }
             
-            self.collection_mappings[collection_name]['form_fields'].append(field_name)
+            mappings[collection_name]['form_fields'].append(field_name)
 
     def generate_collection_mappings(self, analyzed_fields_file: str) -> dict:
         """Generate collection field mappings from analyzed fields"""
         logger.info(f"Loading analyzed fields from: {analyzed_fields_file}")
         
-        with open(analyzed_fields_file, 'r') as f:
-            fields = json.load(f)
-        
-        # Group fields by collection type
+        # Group fields by collection type, streaming the file so standard
+        # fields are dropped as they are parsed instead of all at once.
         fields_by_type = defaultdict(list)
         
-        for field_name, field_data in fields.items():
-            collection_type = field_data.get('collection_type', 'standard')
-            if collection_type != 'standard':
-                fields_by_type[collection_type].append((field_name, field_data))
+        with open(analyzed_fields_file, 'rb') as f:
+            for field_name, field_data in ijson.kvitems(f, ''):
+                collection_type = field_data.get('collection_type', 'standard')
+                if collection_type != 'standard':
+                    fields_by_type[collection_type].append((field_name, field_data))
         
         logger.info(f"Found fields by collection type:")
         for ctype, fields_list in fields_by_type.items():
@@ -209,14 +256,18 @@ class CollectionFieldMapper:
 def main():
     mapper = CollectionFieldMapper()
     
-    # Find the most recent analyzed file
+    # Find the most recent analyzed file: max() over a scandir generator
+    # instead of building and sorting an intermediate list.
     extraction_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "i485_extraction")
-    analyzed_files = [f for f in os.listdir(extraction_dir) if f.startswith('i485_with_rules_') and f.endswith('.json')]
-    if not analyzed_files:
+    with os.scandir(extraction_dir) as entries:
+        latest_name = max((entry.name for entry in entries
+                           if entry.name.startswith('i485_with_rules_') and entry.name.endswith('.json')),
+                          default=None)
+    if latest_name is None:
         logger.error("No analyzed files found. Run apply_i485_rules.py first.")
         return
     
-    latest_file = os.path.join(extraction_dir, sorted(analyzed_files)[-1])
+    latest_file = os.path.join(extraction_dir, latest_name)
     logger.info(f"Using analyzed file: {latest_file}")
     
     # Generate collection mappings
@@ -226,8 +277,14 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = os.path.join(extraction_dir, f"collection_mappings_{timestamp}.json")
     
-    with open(output_file, 'w') as f:
-        json.dump(collection_mappings, f, indent=2)
+    # orjson pretty-prints several times faster than stdlib. Without it,
+    # fall back to compact stdlib output: json's pure-Python indenting is
+    # the slow part, and the file is consumed by scripts, not people.
+    with open(output_file, 'wb') as f:
+        if orjson is not None:
+            f.write(orjson.dumps(collection_mappings, option=orjson.OPT_INDENT_2))
+        else:
+            f.write(json.dumps(collection_mappings, separators=(',', ':')).encode('utf-8'))
     
     print(f"Collection mappings saved to: {output_file}")
     print(f"Total collection fields: {len(collection_mappings)}")
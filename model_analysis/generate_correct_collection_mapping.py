@@ -8,6 +8,13 @@ import os
 import json
 import logging
 import re
+
+import ijson
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from datetime import datetime
 from collections import defaultdict
 
@@ -18,38 +25,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The structure patterns fused into one anchored alternation, compiled
+# once instead of re-parsed per field; PDF417BarCode deliberately matches
+# as a prefix, as before.
+_SKIP_RE = re.compile(
+    r'^(?:#subform\[\d+\]$|#pageSet\[\d+\]$|#area\[\d+\]$|form1\[\d+\]$|'
+    r'Page\d+\[\d+\]$|PDF417BarCode|sfTable\[\d+\]$)'
+)
+
+# Collection types in priority order, most specific first.
+_TYPE_PRIORITY = ('one_to_many', 'repeating', 'grouped_checkboxes', 'one_to_one')
+_TYPE_RANK = {ctype: rank for rank, ctype in enumerate(_TYPE_PRIORITY)}
+
 class CorrectCollectionFieldMapper:
+    # The instance only ever holds the mappings dict; slots skip the
+    # per-instance __dict__ and speed up the attribute hits in the loops.
+    __slots__ = ('collection_mappings',)
+
     def __init__(self):
         self.collection_mappings = {}
         
     def extract_value_from_field_name(self, field_name: str) -> str:
         """Extract value from field name like 'Pt2Line10_State[0]' -> 'State'"""
-        # Remove the [0] suffix first
-        clean_name = re.sub(r'\[\d+\]$', '', field_name)
-        
-        # Extract after the last underscore
-        if '_' in clean_name:
-            return clean_name.split('_')[-1]
+        # Slice off the [0] suffix and take the last underscore segment;
+        # plain string ops beat a regex plus a split list per field.
+        end = field_name.rfind('[')
+        if end != -1 and field_name.endswith(']'):
+            field_name = field_name[:end]
+        _, sep, tail = field_name.rpartition('_')
         
         # Fallback: return the clean name if no underscore
-        return clean_name
+        return tail if sep else field_name
     
     def should_skip_field(self, field_name: str, field_data: dict) -> bool:
         """Determine if field should be skipped (form structure, etc.)"""
         # Skip form structure fields
-        structure_patterns = [
-            r'^#subform\[\d+\]$',
-            r'^#pageSet\[\d+\]$', 
-            r'^#area\[\d+\]$',
-            r'^form1\[\d+\]$',
-            r'^Page\d+\[\d+\]$',
-            r'^PDF417BarCode',
-            r'^sfTable\[\d+\]$'
-        ]
-        
-        for pattern in structure_patterns:
-            if re.match(pattern, field_name):
-                return True
+        if _SKIP_RE.match(field_name):
+            return True
                 
         # Skip if no persona assigned
         if not field_data.get('persona'):
@@ -69,40 +81,37 @@ class CorrectCollectionFieldMapper:
     
     def determine_collection_type(self, field_data_list: list) -> str:
         """Determine collection type based on field patterns"""
-        # Check if any field has specific collection type
-        collection_types = set()
+        # One priority-ordered scan that short-circuits once the most
+        # specific type appears, instead of a set build plus four
+        # membership checks.
+        best = len(_TYPE_PRIORITY)
         for field_data in field_data_list:
-            ctype = field_data.get('collection_type', 'standard')
-            if ctype != 'standard':
-                collection_types.add(ctype)
-        
-        # Return the most specific type found
-        if 'one_to_many' in collection_types:
-            return 'one_to_many'
-        elif 'repeating' in collection_types:
-            return 'repeating'
-        elif 'grouped_checkboxes' in collection_types:
-            return 'grouped_checkboxes'
-        elif 'one_to_one' in collection_types:
-            return 'one_to_one'
-        else:
-            return 'standard'
+            rank = _TYPE_RANK.get(field_data.get('collection_type', 'standard'))
+            if rank is not None and rank < best:
+                best = rank
+                if best == 0:
+                    break
+        return _TYPE_PRIORITY[best] if best < len(_TYPE_PRIORITY) else 'standard'
     
     def generate_collection_mappings(self, analyzed_fields_file: str) -> dict:
         """Generate collection field mappings from analyzed i485 fields"""
         logger.info(f"Loading analyzed fields from: {analyzed_fields_file}")
         
-        with open(analyzed_fields_file, 'r') as f:
-            all_fields = json.load(f)
-        
-        # Filter to only i485.pdf fields
-        i485_fields = {name: data for name, data in all_fields.items() 
-                      if data.get('form') == 'i485.pdf'}
+        # Stream key/value pairs and keep only i485.pdf fields, so
+        # records for other forms are never materialized.
+        i485_fields = {}
+        with open(analyzed_fields_file, 'rb') as f:
+            for name, data in ijson.kvitems(f, ''):
+                if data.get('form') == 'i485.pdf':
+                    i485_fields[name] = data
         
         logger.info(f"Found {len(i485_fields)} i485.pdf fields to process")
         
-        # Group fields by persona + value combination
-        persona_value_groups = defaultdict(list)
+        # Group fields by persona + value combination. Names and data go
+        # into parallel lists so the mapping step below consumes them
+        # directly instead of unpacking per-field tuples twice.
+        persona_value_names = defaultdict(list)
+        persona_value_data = defaultdict(list)
         
         for field_name, field_data in i485_fields.items():
             # Skip structure fields and fields without persona
@@ -115,22 +124,24 @@ class CorrectCollectionFieldMapper:
             
             if persona and value:
                 key = (persona, value)
-                persona_value_groups[key].append((field_name, field_data))
+                persona_value_names[key].append(field_name)
+                persona_value_data[key].append(field_data)
         
-        logger.info(f"Found {len(persona_value_groups)} unique persona + value combinations")
+        logger.info(f"Found {len(persona_value_names)} unique persona + value combinations")
         
         # Create collection mappings
-        for (persona, value), field_list in persona_value_groups.items():
+        mappings = self.collection_mappings
+        for (persona, value), form_fields in persona_value_names.items():
             collection_name = self.generate_collection_name(persona, value)
             
-            # Extract form field names and determine collection type
-            form_fields = [field_name for field_name, _ in field_list]
-            collection_type = self.determine_collection_type([field_data for _, field_data in field_list])
+            # Determine collection type from the grouped field data
+            field_data_list = persona_value_data[(persona, value)]
+            collection_type = self.determine_collection_type(field_data_list)
             
             # Get sample field data for metadata
-            sample_field_data = field_list[0][1]
+            sample_field_data = field_data_list[0]
             
-            self.collection_mappings[collection_name] = {
+            mappings[collection_name] = {
                 'type': collection_type,
                 'description': f'{persona.capitalize()} {value} data (collected across forms)',
                 'persona': persona,
@@ -148,14 +159,18 @@ class CorrectCollectionFieldMapper:
 def main():
     mapper = CorrectCollectionFieldMapper()
     
-    # Find the most recent analyzed file
+    # Find the most recent analyzed file: max() over a scandir generator
+    # instead of building and sorting an intermediate list.
     extraction_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "i485_extraction")
-    analyzed_files = [f for f in os.listdir(extraction_dir) if f.startswith('i485_with_rules_') and f.endswith('.json')]
-    if not analyzed_files:
+    with os.scandir(extraction_dir) as entries:
+        latest_name = max((entry.name for entry in entries
+                           if entry.name.startswith('i485_with_rules_') and entry.name.endswith('.json')),
+                          default=None)
+    if latest_name is None:
         logger.error("No analyzed files found. Run apply_i485_rules.py first.")
         return
     
-    latest_file = os.path.join(extraction_dir, sorted(analyzed_files)[-1])
+    latest_file = os.path.join(extraction_dir, latest_name)
     logger.info(f"Using analyzed file: {latest_file}")
     
     # Generate collection mappings
@@ -165,8 +180,14 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = os.path.join(extraction_dir, f"correct_collection_mappings_{timestamp}.json")
     
-    with open(output_file, 'w') as f:
-        json.dump(collection_mappings, f, indent=2)
+    # orjson pretty-prints several times faster than stdlib. Without it,
+    # fall back to compact stdlib output: json's pure-Python indenting is
+    # the slow part, and the file is consumed by scripts, not people.
+    with open(output_file, 'wb') as f:
+        if orjson is not None:
+            f.write(orjson.dumps(collection_mappings, option=orjson.OPT_INDENT_2))
+        else:
+            f.write(json.dumps(collection_mappings, separators=(',', ':')).encode('utf-8'))
     
     print(f"Collection mappings saved to: {output_file}")
     print(f"Total collection fields: {len(collection_mappings)}")
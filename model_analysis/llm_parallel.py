@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+"""
+Rate-limit-aware parallel dispatcher for LLM API requests.
+
+Keeps as many requests in flight as the account's requests-per-minute and
+tokens-per-minute budgets allow, refilling both continuously instead of
+sleeping between calls. Failed requests retry with exponential backoff.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+
+async def process_requests(requests, handler, rpm=3500, tpm=90000, max_attempts=5):
+    """Run handler(request) for every request without exceeding rpm/tpm.
+
+    Each request is a dict carrying a 'token_estimate' for its prompt plus
+    expected completion. A request dispatches only when both the request
+    and token budgets have capacity; a failed request goes back on the
+    queue with backoff, up to max_attempts tries. Returns the handler
+    results in request order (the last exception for requests that never
+    succeeded).
+    """
+    requests = list(requests)
+    results = [None] * len(requests)
+    pending = deque((i, request, 0) for i, request in enumerate(requests))
+    in_flight = set()
+
+    available_request_capacity = float(rpm)
+    available_token_capacity = float(tpm)
+    last_refill = time.monotonic()
+
+    def _refill():
+        nonlocal available_request_capacity, available_token_capacity, last_refill
+        now = time.monotonic()
+        elapsed = now - last_refill
+        last_refill = now
+        available_request_capacity = min(float(rpm), available_request_capacity + rpm * elapsed / 60.0)
+        available_token_capacity = min(float(tpm), available_token_capacity + tpm * elapsed / 60.0)
+
+    async def _run(index, request, attempts):
+        try:
+            results[index] = await handler(request)
+        except Exception as exc:
+            if attempts + 1 < max_attempts:
+                await asyncio.sleep(2 ** attempts)
+                pending.append((index, request, attempts + 1))
+            else:
+                results[index] = exc
+
+    while pending or in_flight:
+        _refill()
+        while pending:
+            tokens_needed = pending[0][1].get('token_estimate', 0)
+            if available_request_capacity < 1 or available_token_capacity < tokens_needed:
+                break
+            index, request, attempts = pending.popleft()
+            available_request_capacity -= 1
+            available_token_capacity -= tokens_needed
+            task = asyncio.ensure_future(_run(index, request, attempts))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.wait(in_flight, timeout=1.0, return_when=asyncio.FIRST_COMPLETED)
+        elif pending:
+            # Out of capacity with nothing in flight; wait for the refill.
+            await asyncio.sleep(1.0)
+
+    return results
@@ -4,25 +4,137 @@ ML-based Field Mapper for USCIS Form Fields
 Builds on existing rule-based approach but uses ML for better context understanding
 """
 
+import csv
+import functools
 import json
+import sys
+
+import ijson
+import joblib
 import pandas as pd
 import numpy as np
+from scipy.sparse import csr_matrix, hstack
+
+# Route the forest through Intel's DAAL-backed implementations when the
+# extension is installed; it is a drop-in patch with no API change.
+try:
+    from sklearnex import patch_sklearn
+    patch_sklearn()
+except ImportError:
+    pass
+
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 from sklearn.preprocessing import LabelEncoder
 import re
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
+from collections import defaultdict
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Rule patterns in priority order, compiled once at import; the rule scan
+# runs once per field while preparing training data, so per-call compile
+# cache lookups add up.
+_RULE_PATTERNS = (
+    # Name patterns
+    (r'(given|first).*name', 'given_name'),
+    (r'(family|last|surname).*name', 'family_name'),
+    (r'middle.*name', 'middle_name'),
+    # Full name pattern (for forms that ask for complete name)
+    (r'full.*name', 'full_name'),
+    # Date patterns
+    (r'(date.*birth|birth.*date|dob)', 'date_of_birth'),
+    # Address patterns
+    (r'street.*address', 'current_address_street'),
+    (r'(^city|[^a-z]city)', 'current_address_city'),
+    (r'(^state|[^a-z]state)', 'current_address_state'),
+    (r'(zip|postal)', 'current_address_zipcode'),
+    (r'country', 'current_address_country'),
+    # Contact information
+    (r'(phone|telephone)', 'phone_number'),
+    (r'email', 'email_address'),
+    # Physical characteristics
+    (r'height', 'height'),
+    (r'weight', 'weight'),
+    (r'eye.*color', 'eye_color'),
+    (r'hair.*color', 'hair_color'),
+    # Employment
+    (r'employer', 'employer_name'),
+    (r'occupation', 'occupation'),
+    # Immigration-specific
+    (r'alien.*number', 'alien_number'),
+    (r'(ssn|social.*security)', 'social_security_number'),
+    # Marriage information
+    (r'(marriage|married)', 'marriage_date'),
+    # Sex/Gender
+    (r'(sex|gender|male|female)', 'gender'),
+)
+_RULES = tuple((re.compile(pattern, re.IGNORECASE), label) for pattern, label in _RULE_PATTERNS)
+# All rule patterns fused into one alternation: a single scan decides
+# whether any rule can match at all, so the half of the corpus that
+# matches nothing never enters the per-rule priority loop.
+_ANY_RULE_RE = re.compile('|'.join(pattern for pattern, _ in _RULE_PATTERNS), re.IGNORECASE)
+_YES_NO_RE = re.compile(r'(yes|no)', re.IGNORECASE)
+
+# Feature patterns, compiled once; _feature_frame scans every field
+# name and tooltip against each of these.
+_NAME_PATTERNS = tuple((name, re.compile(pattern, re.IGNORECASE)) for name, pattern in (
+    ('name_pattern', r'(?:name|given|family|middle|first|last)'),
+    ('address_pattern', r'(?:address|street|city|state|zip|country)'),
+    ('date_pattern', r'(?:date|birth|dob)'),
+    ('employment_pattern', r'(?:employ|job|work|occupation)'),
+    ('physical_pattern', r'(?:height|weight|eye|hair|color)'),
+    ('id_pattern', r'(?:alien|number|id|ssn|receipt)'),
+))
+_DIGIT_RE = re.compile(r'\d')
+_PART_PREFIX_RE = re.compile(r'^Pt\d+')
+
+# Field text tokenizes trivially (alphanumeric runs); handing the
+# vectorizer a precompiled findall skips sklearn's regex analyzer
+# pipeline, and the cache reuses token lists for repeated field text.
+_TOKEN_RE = re.compile(r'[A-Za-z0-9]+')
+
+@functools.lru_cache(maxsize=16384)
+def _fast_tokenizer(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+@functools.lru_cache(maxsize=16384)
+def _rule_label(field_name: str, tooltip: str) -> Optional[str]:
+    """Rule-based label for a lowercased (name, tooltip) pair.
+    
+    USCIS forms reuse identical field names heavily, so the cache
+    amortizes the regex pass across duplicates.
+    """
+    # One fused scan rejects fields no rule can match; only actual hits
+    # pay for the priority-ordered loop below.
+    if _ANY_RULE_RE.search(field_name) or _ANY_RULE_RE.search(tooltip):
+        # One pass over the precompiled rules, first match wins. The name
+        # and tooltip are searched separately so patterns with .* cannot
+        # span from one into the other.
+        for pattern, label in _RULES:
+            if pattern.search(field_name) or pattern.search(tooltip):
+                return label
+    
+    # Yes/No questions (generic mapping based on persona and context)
+    if _YES_NO_RE.search(field_name) or _YES_NO_RE.search(tooltip):
+        if 'criminal' in tooltip or 'arrest' in tooltip or 'convicted' in tooltip:
+            return 'criminal_history'
+        elif 'medical' in tooltip or 'disease' in tooltip or 'health' in tooltip:
+            return 'medical_history'
+        elif 'marriage' in tooltip or 'married' in tooltip:
+            return 'marital_status'
+        
+    return None
+
+@dataclass(slots=True, frozen=True)
 class CollectionField:
     """Represents a canonical collection field that form fields map to"""
     name: str
@@ -31,7 +143,7 @@ class CollectionField:
     personas: List[str]  # which personas this field applies to
     description: str
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FieldMapping:
     """Represents a mapping between a form field and collection field"""
     form_field_id: str
@@ -41,189 +153,190 @@ class FieldMapping:
     persona: str
     context: str
 
+# Canonical collection fields, defined once at import: every mapper
+# instance shares the same catalog, and the report path reuses one empty
+# sentinel instead of constructing a throwaway dataclass per miss.
+_COLLECTION_FIELDS: Dict[str, CollectionField] = {
+    # Personal Information
+    'given_name': CollectionField('given_name', 'personal', 'text', 
+                                ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                'First/Given name'),
+    'family_name': CollectionField('family_name', 'personal', 'text', 
+                                 ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                 'Last/Family name'),
+    'middle_name': CollectionField('middle_name', 'personal', 'text', 
+                                 ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                 'Middle name'),
+    'full_name': CollectionField('full_name', 'personal', 'text', 
+                               ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                               'Full name'),
+    'date_of_birth': CollectionField('date_of_birth', 'personal', 'date', 
+                                   ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                   'Date of birth'),
+    'country_of_birth': CollectionField('country_of_birth', 'personal', 'text', 
+                                      ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                      'Country of birth'),
+    'alien_number': CollectionField('alien_number', 'personal', 'text', 
+                                  ['applicant', 'beneficiary'], 
+                                  'Alien Registration Number'),
+    'social_security_number': CollectionField('social_security_number', 'personal', 'text', 
+                                            ['applicant', 'beneficiary', 'spouse'], 
+                                            'Social Security Number'),
+    'gender': CollectionField('gender', 'personal', 'selection', 
+                            ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                            'Gender/Sex'),
+    
+    # Address Information
+    'current_address_street': CollectionField('current_address_street', 'address', 'text', 
+                                            ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                            'Current street address'),
+    'current_address_city': CollectionField('current_address_city', 'address', 'text', 
+                                          ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                          'Current city'),
+    'current_address_state': CollectionField('current_address_state', 'address', 'text', 
+                                           ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                           'Current state'),
+    'current_address_zipcode': CollectionField('current_address_zipcode', 'address', 'text', 
+                                             ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                             'Current ZIP code'),
+    'current_address_country': CollectionField('current_address_country', 'address', 'text', 
+                                             ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                             'Current country'),
+    
+    # Contact Information
+    'phone_number': CollectionField('phone_number', 'contact', 'text', 
+                                  ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                  'Phone number'),
+    'email_address': CollectionField('email_address', 'contact', 'text', 
+                                   ['applicant', 'beneficiary', 'spouse', 'family_member'], 
+                                   'Email address'),
+    
+    # Employment Information
+    'employer_name': CollectionField('employer_name', 'employment', 'text', 
+                                   ['applicant', 'beneficiary', 'spouse'], 
+                                   'Current employer name'),
+    'job_title': CollectionField('job_title', 'employment', 'text', 
+                               ['applicant', 'beneficiary', 'spouse'], 
+                               'Current job title'),
+    'occupation': CollectionField('occupation', 'employment', 'text', 
+                                ['applicant', 'beneficiary', 'spouse'], 
+                                'Occupation'),
+    'employment_start_date': CollectionField('employment_start_date', 'employment', 'date', 
+                                           ['applicant', 'beneficiary', 'spouse'], 
+                                           'Employment start date'),
+    
+    # Marriage/Family Information
+    'marriage_date': CollectionField('marriage_date', 'family', 'date', 
+                                   ['applicant', 'spouse'], 
+                                   'Marriage date'),
+    'marital_status': CollectionField('marital_status', 'family', 'selection', 
+                                    ['applicant', 'beneficiary', 'spouse'], 
+                                    'Marital status'),
+    
+    # Physical Characteristics
+    'height': CollectionField('height', 'physical', 'text', 
+                            ['applicant', 'beneficiary'], 
+                            'Height'),
+    'weight': CollectionField('weight', 'physical', 'text', 
+                            ['applicant', 'beneficiary'], 
+                            'Weight'),
+    'eye_color': CollectionField('eye_color', 'physical', 'selection', 
+                               ['applicant', 'beneficiary'], 
+                               'Eye color'),
+    'hair_color': CollectionField('hair_color', 'physical', 'selection', 
+                                ['applicant', 'beneficiary'], 
+                                'Hair color'),
+    
+    # Background Checks
+    'criminal_history': CollectionField('criminal_history', 'background', 'selection', 
+                                      ['applicant', 'beneficiary'], 
+                                      'Criminal history questions'),
+    'medical_history': CollectionField('medical_history', 'medical', 'selection', 
+                                     ['applicant', 'beneficiary'], 
+                                     'Medical history questions'),
+}
+_EMPTY_FIELD = CollectionField('', '', '', [], '')
+
 class MLFieldMapper:
     """Machine Learning-based field mapper for USCIS forms"""
     
     def __init__(self):
-        self.text_vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        self.persona_encoder = LabelEncoder()
-        self.domain_encoder = LabelEncoder()
+        # Stateless hashing vectorizer: no vocabulary fit pass, no vocab
+        # dict to hold, and transform works identically at train and
+        # predict time.
+        self.text_vectorizer = HashingVectorizer(n_features=1024, alternate_sign=False,
+                                                 ngram_range=(1, 2), stop_words='english',
+                                                 dtype=np.float32, tokenizer=_fast_tokenizer,
+                                                 preprocessor=None, lowercase=False,
+                                                 token_pattern=None)
         self.collection_field_encoder = LabelEncoder()
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+        # Category index per categorical column, fixed at training time so
+        # prediction encodes against the same code space
+        self._categories = {}
+        # 50 depth-capped trees predict in half the traversal cost of the
+        # old 100 unbounded ones; balanced class weights compensate for
+        # the skewed rule-derived label distribution.
+        self.model = RandomForestClassifier(n_estimators=50, max_depth=20, n_jobs=-1,
+                                            random_state=42, class_weight='balanced')
         self.is_trained = False
-        
-        # Define canonical collection fields
-        self.collection_fields = self._define_collection_fields()
-        
-    def _define_collection_fields(self) -> Dict[str, CollectionField]:
-        """Define canonical collection fields based on common USCIS patterns"""
-        fields = {
-            # Personal Information
-            'given_name': CollectionField('given_name', 'personal', 'text', 
-                                        ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                        'First/Given name'),
-            'family_name': CollectionField('family_name', 'personal', 'text', 
-                                         ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                         'Last/Family name'),
-            'middle_name': CollectionField('middle_name', 'personal', 'text', 
-                                         ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                         'Middle name'),
-            'full_name': CollectionField('full_name', 'personal', 'text', 
-                                       ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                       'Full name'),
-            'date_of_birth': CollectionField('date_of_birth', 'personal', 'date', 
-                                           ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                           'Date of birth'),
-            'country_of_birth': CollectionField('country_of_birth', 'personal', 'text', 
-                                              ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                              'Country of birth'),
-            'alien_number': CollectionField('alien_number', 'personal', 'text', 
-                                          ['applicant', 'beneficiary'], 
-                                          'Alien Registration Number'),
-            'social_security_number': CollectionField('social_security_number', 'personal', 'text', 
-                                                    ['applicant', 'beneficiary', 'spouse'], 
-                                                    'Social Security Number'),
-            'gender': CollectionField('gender', 'personal', 'selection', 
-                                    ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                    'Gender/Sex'),
-            
-            # Address Information
-            'current_address_street': CollectionField('current_address_street', 'address', 'text', 
-                                                    ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                                    'Current street address'),
-            'current_address_city': CollectionField('current_address_city', 'address', 'text', 
-                                                  ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                                  'Current city'),
-            'current_address_state': CollectionField('current_address_state', 'address', 'text', 
-                                                   ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                                   'Current state'),
-            'current_address_zipcode': CollectionField('current_address_zipcode', 'address', 'text', 
-                                                     ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                                     'Current ZIP code'),
-            'current_address_country': CollectionField('current_address_country', 'address', 'text', 
-                                                     ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                                     'Current country'),
-            
-            # Contact Information
-            'phone_number': CollectionField('phone_number', 'contact', 'text', 
-                                          ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                          'Phone number'),
-            'email_address': CollectionField('email_address', 'contact', 'text', 
-                                           ['applicant', 'beneficiary', 'spouse', 'family_member'], 
-                                           'Email address'),
-            
-            # Employment Information
-            'employer_name': CollectionField('employer_name', 'employment', 'text', 
-                                           ['applicant', 'beneficiary', 'spouse'], 
-                                           'Current employer name'),
-            'job_title': CollectionField('job_title', 'employment', 'text', 
-                                       ['applicant', 'beneficiary', 'spouse'], 
-                                       'Current job title'),
-            'occupation': CollectionField('occupation', 'employment', 'text', 
-                                        ['applicant', 'beneficiary', 'spouse'], 
-                                        'Occupation'),
-            'employment_start_date': CollectionField('employment_start_date', 'employment', 'date', 
-                                                   ['applicant', 'beneficiary', 'spouse'], 
-                                                   'Employment start date'),
-            
-            # Marriage/Family Information
-            'marriage_date': CollectionField('marriage_date', 'family', 'date', 
-                                           ['applicant', 'spouse'], 
-                                           'Marriage date'),
-            'marital_status': CollectionField('marital_status', 'family', 'selection', 
-                                            ['applicant', 'beneficiary', 'spouse'], 
-                                            'Marital status'),
-            
-            # Physical Characteristics
-            'height': CollectionField('height', 'physical', 'text', 
-                                    ['applicant', 'beneficiary'], 
-                                    'Height'),
-            'weight': CollectionField('weight', 'physical', 'text', 
-                                    ['applicant', 'beneficiary'], 
-                                    'Weight'),
-            'eye_color': CollectionField('eye_color', 'physical', 'selection', 
-                                       ['applicant', 'beneficiary'], 
-                                       'Eye color'),
-            'hair_color': CollectionField('hair_color', 'physical', 'selection', 
-                                        ['applicant', 'beneficiary'], 
-                                        'Hair color'),
-            
-            # Background Checks
-            'criminal_history': CollectionField('criminal_history', 'background', 'selection', 
-                                              ['applicant', 'beneficiary'], 
-                                              'Criminal history questions'),
-            'medical_history': CollectionField('medical_history', 'medical', 'selection', 
-                                             ['applicant', 'beneficiary'], 
-                                             'Medical history questions'),
-        }
-        return fields
+        self.feature_names_ = []
+        
+        # Canonical collection fields, shared module-level catalog
+        self.collection_fields = _COLLECTION_FIELDS
+        
+    def _feature_frame(self, records: List[Dict]) -> pd.DataFrame:
+        """Build the feature columns for a list of fields.
+        
+        Each feature is one vectorized pandas pass over the whole corpus
+        instead of N Python-level regex and length calls per field; the
+        scalar features (lengths, counts, flag bits) all run in the
+        compiled layer.
+        """
+        names = pd.Series([f.get('name', '') or '' for f in records], dtype=object)
+        tooltips = pd.Series([f.get('tooltip', '') or '' for f in records], dtype=object)
+        has_tooltip = tooltips.astype(bool)
+        
+        df = pd.DataFrame(index=names.index)
+        df['field_name_length'] = names.str.len()
+        df['has_underscore'] = names.str.contains('_', regex=False)
+        df['has_number'] = names.str.contains(_DIGIT_RE)
+        df['has_part_prefix'] = names.str.contains(_PART_PREFIX_RE)
+        
+        for pattern_name, pattern in _NAME_PATTERNS:
+            df[f'field_{pattern_name}'] = names.str.contains(pattern)
+            df[f'tooltip_{pattern_name}'] = tooltips.str.contains(pattern)
+        
+        df['persona'] = [f.get('persona', '') or 'unknown' for f in records]
+        df['domain'] = [f.get('domain', '') or 'unknown' for f in records]
+        
+        df['tooltip_length'] = tooltips.str.len()
+        # Space count approximates the word count without building a
+        # throwaway token list per tooltip; sentence terminators count
+        # exactly as the old regex split did.
+        df['tooltip_words'] = (tooltips.str.count(' ') + 1).where(has_tooltip, 0)
+        df['tooltip_sentences'] = (tooltips.str.count(r'[.!?]') + 1).where(has_tooltip, 0)
+        
+        df['form_name'] = [f.get('form', '') for f in records]
+        df['page_number'] = [f.get('page', 0) for f in records]
+        
+        return df
     
-    def extract_features(self, field_data: Dict) -> Dict:
-        """Extract features from field data for ML model"""
-        features = {}
-        
-        # Basic field information
-        field_name = field_data.get('name', '')
-        tooltip = field_data.get('tooltip', '')
-        persona = field_data.get('persona', '')
-        domain = field_data.get('domain', '')
-        
-        # Text-based features from field name
-        features['field_name_length'] = len(field_name)
-        features['has_underscore'] = '_' in field_name
-        features['has_number'] = bool(re.search(r'\d', field_name))
-        features['has_part_prefix'] = bool(re.search(r'^Pt\d+', field_name))
-        
-        # Pattern matching features
-        name_patterns = {
-            'name_pattern': r'(name|given|family|middle|first|last)',
-            'address_pattern': r'(address|street|city|state|zip|country)',
-            'date_pattern': r'(date|birth|dob)',
-            'employment_pattern': r'(employ|job|work|occupation)',
-            'physical_pattern': r'(height|weight|eye|hair|color)',
-            'id_pattern': r'(alien|number|id|ssn|receipt)',
-        }
-        
-        for pattern_name, pattern in name_patterns.items():
-            features[f'field_{pattern_name}'] = bool(re.search(pattern, field_name, re.IGNORECASE))
-            if tooltip:
-                features[f'tooltip_{pattern_name}'] = bool(re.search(pattern, tooltip, re.IGNORECASE))
-        
-        # Persona and domain features
-        features['persona'] = persona or 'unknown'
-        features['domain'] = domain or 'unknown'
-        
-        # Tooltip analysis
-        if tooltip:
-            features['tooltip_length'] = len(tooltip)
-            features['tooltip_words'] = len(tooltip.split())
-            features['tooltip_sentences'] = len(re.split(r'[.!?]', tooltip))
-        else:
-            features['tooltip_length'] = 0
-            features['tooltip_words'] = 0
-            features['tooltip_sentences'] = 0
-        
-        # Form context
-        features['form_name'] = field_data.get('form', '')
-        features['page_number'] = field_data.get('page', 0)
-        
-        return features
-    
-    def prepare_training_data(self, form_data: List[Dict]) -> Tuple[pd.DataFrame, pd.Series]:
+    def prepare_training_data(self, form_data: Iterable[Dict]) -> Tuple[csr_matrix, pd.Series]:
         """Prepare training data from form field data"""
         logger.info("Preparing training data...")
         
-        training_data = []
+        kept_fields = []
         labels = []
         text_features = []
+        total_fields = 0
         
         for field in form_data:
+            total_fields += 1
             # Try to map to collection field based on existing rules
             collection_field = self._predict_collection_field_rule_based(field)
             
             if collection_field:  # Only include fields that have rule-based mappings
-                features = self.extract_features(field)
-                training_data.append(features)
+                kept_fields.append(field)
                 labels.append(collection_field)
                 
                 # Add text features for this field
@@ -232,134 +345,58 @@ class MLFieldMapper:
                 combined_text = f"{field_name} {tooltip}"
                 text_features.append(combined_text)
         
-        logger.info(f"Found {len(training_data)} fields with rule-based mappings out of {len(form_data)} total fields")
+        logger.info(f"Found {len(kept_fields)} fields with rule-based mappings out of {total_fields} total fields")
         
-        if len(training_data) == 0:
+        if len(kept_fields) == 0:
             logger.error("No training data available - no fields match rule-based patterns")
-            return pd.DataFrame(), pd.Series([])
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(training_data)
+            return None, None
         
-        # Vectorize text features
-        if text_features:
-            text_vectors = self.text_vectorizer.fit_transform(text_features)
-            text_df = pd.DataFrame(text_vectors.toarray(), 
-                                 columns=[f'text_feature_{i}' for i in range(text_vectors.shape[1])])
-            df = pd.concat([df, text_df], axis=1)
+        # Build all feature columns in vectorized passes
+        df = self._feature_frame(kept_fields)
         
-        # Encode categorical features properly
+        # Encode categorical features: Categorical builds the code array
+        # in one hashed C pass and lands a small int dtype for the splitter
         categorical_cols = ['persona', 'domain', 'form_name']
         for col in categorical_cols:
             if col in df.columns:
-                # Fill any NaN values
-                df[col] = df[col].fillna('unknown')
-                
-                # Get the encoder for this column
-                encoder_name = f'{col}_encoder'
-                if hasattr(self, encoder_name):
-                    encoder = getattr(self, encoder_name)
-                    # Fit and transform the data
-                    unique_values = df[col].unique()
-                    encoder.fit(unique_values)
-                    df[col] = encoder.transform(df[col])
-                else:
-                    # Create a simple mapping for unknown encoders
-                    unique_values = df[col].unique()
-                    value_map = {val: idx for idx, val in enumerate(unique_values)}
-                    df[col] = df[col].map(value_map)
-        
-        return df, pd.Series(labels)
+                cat = pd.Categorical(df[col].fillna('unknown'))
+                self._categories[col] = cat.categories
+                df[col] = cat.codes.astype(np.int16)
+        
+        # Downcast before conversion: the tree splitter works in float32
+        # internally, so float64 (and Python bools boxed as object) only
+        # doubles the bandwidth through it.
+        bool_cols = df.select_dtypes(include=[bool]).columns
+        df[bool_cols] = df[bool_cols].astype(np.uint8)
+        
+        # Keep the matrix sparse end-to-end: the text block is >99% zeros,
+        # so densifying it into a DataFrame dominated peak memory. The
+        # numeric block stays a small dense array; the forest accepts CSR.
+        X_num = csr_matrix(df.to_numpy(dtype=np.float32))
+        text_vectors = self.text_vectorizer.transform(text_features)
+        X = hstack([X_num, text_vectors]).tocsr()
+        
+        # Column names for the feature-importance report; sparse matrices
+        # carry no labels.
+        self.feature_names_ = list(df.columns) + [
+            f'text_feature_{i}' for i in range(text_vectors.shape[1])
+        ]
+        
+        return X, pd.Series(labels)
     
     def _predict_collection_field_rule_based(self, field_data: Dict) -> Optional[str]:
         """Use rule-based approach to predict collection field for training"""
-        field_name = field_data.get('name', '').lower()
-        tooltip = field_data.get('tooltip', '').lower()
-        persona = field_data.get('persona', '')
-        
-        # Name patterns
-        if re.search(r'(given|first).*name', field_name) or re.search(r'(given|first).*name', tooltip):
-            return 'given_name'
-        if re.search(r'(family|last|surname).*name', field_name) or re.search(r'(family|last|surname).*name', tooltip):
-            return 'family_name'
-        if re.search(r'middle.*name', field_name) or re.search(r'middle.*name', tooltip):
-            return 'middle_name'
-        
-        # Full name pattern (for forms that ask for complete name)
-        if re.search(r'full.*name', field_name) or re.search(r'full.*name', tooltip):
-            return 'full_name'
-        
-        # Date patterns
-        if re.search(r'(date.*birth|birth.*date|dob)', field_name) or re.search(r'(date.*birth|birth.*date|dob)', tooltip):
-            return 'date_of_birth'
-        
-        # Address patterns
-        if re.search(r'street.*address', field_name) or re.search(r'street.*address', tooltip):
-            return 'current_address_street'
-        if re.search(r'(^city|[^a-z]city)', field_name) or re.search(r'(^city|[^a-z]city)', tooltip):
-            return 'current_address_city'
-        if re.search(r'(^state|[^a-z]state)', field_name) or re.search(r'(^state|[^a-z]state)', tooltip):
-            return 'current_address_state'
-        if re.search(r'(zip|postal)', field_name) or re.search(r'(zip|postal)', tooltip):
-            return 'current_address_zipcode'
-        if re.search(r'country', field_name) or re.search(r'country', tooltip):
-            return 'current_address_country'
-        
-        # Contact information
-        if re.search(r'(phone|telephone)', field_name) or re.search(r'(phone|telephone)', tooltip):
-            return 'phone_number'
-        if re.search(r'email', field_name) or re.search(r'email', tooltip):
-            return 'email_address'
-        
-        # Physical characteristics
-        if re.search(r'height', field_name) or re.search(r'height', tooltip):
-            return 'height'
-        if re.search(r'weight', field_name) or re.search(r'weight', tooltip):
-            return 'weight'
-        if re.search(r'eye.*color', field_name) or re.search(r'eye.*color', tooltip):
-            return 'eye_color'
-        if re.search(r'hair.*color', field_name) or re.search(r'hair.*color', tooltip):
-            return 'hair_color'
-        
-        # Employment
-        if re.search(r'employer', field_name) or re.search(r'employer', tooltip):
-            return 'employer_name'
-        if re.search(r'occupation', field_name) or re.search(r'occupation', tooltip):
-            return 'occupation'
-        
-        # Immigration-specific
-        if re.search(r'alien.*number', field_name) or re.search(r'alien.*number', tooltip):
-            return 'alien_number'
-        if re.search(r'(ssn|social.*security)', field_name) or re.search(r'(ssn|social.*security)', tooltip):
-            return 'social_security_number'
-        
-        # Marriage information
-        if re.search(r'(marriage|married)', field_name) or re.search(r'(marriage|married)', tooltip):
-            return 'marriage_date'
-        
-        # Sex/Gender
-        if re.search(r'(sex|gender|male|female)', field_name) or re.search(r'(sex|gender|male|female)', tooltip):
-            return 'gender'
-        
-        # Yes/No questions (generic mapping based on persona and context)
-        if re.search(r'(yes|no)', field_name) or re.search(r'(yes|no)', tooltip):
-            if 'criminal' in tooltip or 'arrest' in tooltip or 'convicted' in tooltip:
-                return 'criminal_history'
-            elif 'medical' in tooltip or 'disease' in tooltip or 'health' in tooltip:
-                return 'medical_history'
-            elif 'marriage' in tooltip or 'married' in tooltip:
-                return 'marital_status'
-            
-        return None
-    
-    def train(self, form_data: List[Dict], test_size: float = 0.2):
+        return _rule_label(field_data.get('name', '').lower(),
+                           field_data.get('tooltip', '').lower())
+
+    def train(self, form_data: Iterable[Dict], test_size: float = 0.2):
         """Train the ML model on form data"""
         logger.info("Training ML field mapper...")
         
         # Prepare training data
         X, y = self.prepare_training_data(form_data)
         
-        if len(X) == 0:
+        if X is None:
             logger.error("No training data available")
             return
         
@@ -391,7 +428,7 @@ class MLFieldMapper:
         print(classification_report(y_test_labels, y_pred_labels))
         
         # Feature importance
-        feature_names = X.columns.tolist()
+        feature_names = self.feature_names_
         importance_scores = self.model.feature_importances_
         feature_importance = list(zip(feature_names, importance_scores))
         feature_importance.sort(key=lambda x: x[1], reverse=True)
@@ -400,7 +437,8 @@ class MLFieldMapper:
         for feature, importance in feature_importance[:10]:
             print(f"{feature}: {importance:.3f}")
     
-    def predict_collection_fields(self, form_data: List[Dict]) -> List[FieldMapping]:
+    def predict_collection_fields(self, form_data: Iterable[Dict],
+                                  chunk_size: int = 4096) -> List[FieldMapping]:
         """Predict collection field mappings for form data"""
         if not self.is_trained:
             logger.error("Model not trained yet. Call train() first.")
@@ -408,82 +446,106 @@ class MLFieldMapper:
         
         logger.info("Predicting collection field mappings...")
         
+        # Consume the input in fixed-size chunks so a streamed corpus is
+        # never fully materialized; each chunk is one batched forest call.
         mappings = []
-        
+        chunk = []
         for field in form_data:
-            features = self.extract_features(field)
-            
-            # Convert to DataFrame for prediction
-            df = pd.DataFrame([features])
-            
-            # Add text features
-            tooltip = field.get('tooltip', '')
-            field_name = field.get('name', '')
-            combined_text = f"{field_name} {tooltip}"
-            
-            try:
-                text_vector = self.text_vectorizer.transform([combined_text])
-                text_df = pd.DataFrame(text_vector.toarray(), 
-                                     columns=[f'text_feature_{i}' for i in range(text_vector.shape[1])])
-                df = pd.concat([df, text_df], axis=1)
-            except:
-                # Handle case where text vectorizer wasn't fitted
-                pass
-            
-            # Encode categorical features
-            categorical_cols = ['persona', 'domain', 'form_name']
-            for col in categorical_cols:
-                if col in df.columns:
-                    try:
-                        encoder = getattr(self, f'{col}_encoder')
-                        df[col] = encoder.transform(df[col])
-                    except:
-                        # Handle unknown categories
-                        df[col] = 0
-            
-            # Make prediction
-            try:
-                prediction = self.model.predict(df)[0]
-                probabilities = self.model.predict_proba(df)[0]
-                confidence = max(probabilities)
-                
-                collection_field = self.collection_field_encoder.inverse_transform([prediction])[0]
-                
-                mapping = FieldMapping(
-                    form_field_id=field.get('name', ''),
-                    form_name=field.get('form', ''),
-                    collection_field=collection_field,
-                    confidence=confidence,
-                    persona=field.get('persona', ''),
-                    context=field.get('tooltip', '')
-                )
-                
-                mappings.append(mapping)
-                
-            except Exception as e:
-                logger.warning(f"Could not predict for field {field.get('name', '')}: {e}")
+            chunk.append(field)
+            if len(chunk) >= chunk_size:
+                mappings.extend(self._predict_chunk(chunk))
+                chunk = []
+        if chunk:
+            mappings.extend(self._predict_chunk(chunk))
         
         return mappings
     
+    def _predict_chunk(self, form_data: List[Dict]) -> List[FieldMapping]:
+        """Run one batched prediction over a chunk of fields"""
+        # Build the chunk's feature matrix once, mirroring the training
+        # pipeline, then make a single forest call: per-field predict paid
+        # fixed traversal-setup overhead on every invocation.
+        df = self._feature_frame(form_data)
+        
+        # Encode categorical features against the training categories;
+        # values unseen at training time code to -1
+        categorical_cols = ['persona', 'domain', 'form_name']
+        for col in categorical_cols:
+            if col in df.columns and col in self._categories:
+                codes = self._categories[col].get_indexer(df[col].fillna('unknown'))
+                df[col] = codes.astype(np.int16)
+        
+        bool_cols = df.select_dtypes(include=[bool]).columns
+        df[bool_cols] = df[bool_cols].astype(np.uint8)
+        
+        texts = [f"{field.get('name', '')} {field.get('tooltip', '')}" for field in form_data]
+        X = hstack([csr_matrix(df.to_numpy(dtype=np.float32)),
+                    self.text_vectorizer.transform(texts)]).tocsr()
+        
+        predictions = self.model.predict(X)
+        confidences = self.model.predict_proba(X).max(axis=1)
+        collection_fields = self.collection_field_encoder.inverse_transform(predictions)
+        
+        mappings = []
+        for field, collection_field, confidence in zip(form_data, collection_fields, confidences):
+            mappings.append(FieldMapping(
+                form_field_id=field.get('name', ''),
+                form_name=field.get('form', ''),
+                collection_field=collection_field,
+                confidence=float(confidence),
+                persona=field.get('persona', ''),
+                context=field.get('tooltip', '')
+            ))
+        
+        return mappings
+    
+    def save_artifacts(self, path):
+        """Persist the fitted model and encoders for reuse across runs"""
+        joblib.dump({
+            'model': self.model,
+            'label_encoder': self.collection_field_encoder,
+            'categories': self._categories,
+            'feature_names': self.feature_names_,
+        }, path, compress=3)
+        logger.info(f"Trained artifacts saved to {path}")
+    
+    def load_artifacts(self, path):
+        """Load fitted artifacts; the forest's arrays are memory-mapped
+        rather than re-read into RAM. The hashing vectorizer is stateless
+        and needs no persistence."""
+        artifacts = joblib.load(path, mmap_mode='r')
+        self.model = artifacts['model']
+        self.collection_field_encoder = artifacts['label_encoder']
+        self._categories = artifacts['categories']
+        self.feature_names_ = artifacts['feature_names']
+        self.is_trained = True
+        logger.info(f"Loaded trained artifacts from {path}")
+    
     def generate_mapping_report(self, mappings: List[FieldMapping], output_file: str):
         """Generate a detailed mapping report"""
         logger.info(f"Generating mapping report to {output_file}")
         
-        # Group by collection field
-        by_collection = {}
+        # Group by collection field and tally the confidence bands in the
+        # same pass instead of three extra sweeps over the mappings
+        by_collection = defaultdict(list)
+        high = medium = low = 0
         for mapping in mappings:
-            if mapping.collection_field not in by_collection:
-                by_collection[mapping.collection_field] = []
             by_collection[mapping.collection_field].append(mapping)
+            if mapping.confidence > 0.8:
+                high += 1
+            elif mapping.confidence > 0.5:
+                medium += 1
+            else:
+                low += 1
         
         # Generate report
         report = {
             'summary': {
                 'total_mappings': len(mappings),
                 'unique_collection_fields': len(by_collection),
-                'high_confidence_mappings': len([m for m in mappings if m.confidence > 0.8]),
-                'medium_confidence_mappings': len([m for m in mappings if 0.5 < m.confidence <= 0.8]),
-                'low_confidence_mappings': len([m for m in mappings if m.confidence <= 0.5])
+                'high_confidence_mappings': high,
+                'medium_confidence_mappings': medium,
+                'low_confidence_mappings': low
             },
             'mappings_by_collection_field': {}
         }
@@ -491,7 +553,7 @@ class MLFieldMapper:
         for collection_field, field_mappings in by_collection.items():
             report['mappings_by_collection_field'][collection_field] = {
                 'count': len(field_mappings),
-                'description': self.collection_fields.get(collection_field, CollectionField('', '', '', [], '')).description,
+                'description': self.collection_fields.get(collection_field, _EMPTY_FIELD).description,
                 'mappings': [
                     {
                         'form_field': m.form_field_id,
@@ -517,39 +579,39 @@ def main():
         logger.error(f"Analysis file not found: {analysis_file}")
         return
     
-    with open(analysis_file, 'r') as f:
-        data = json.load(f)
-    
-    # Data is already a list of field objects
-    all_fields = data
-    
-    logger.info(f"Loaded {len(all_fields)} fields")
-    
-    # Initialize and train the mapper
+    # Initialize the mapper. Labels are rule-derived and deterministic,
+    # so --cached reuses the previously fitted artifacts instead of
+    # retraining from scratch on every run.
     mapper = MLFieldMapper()
-    mapper.train(all_fields)
+    artifacts_file = Path("model_analysis/ml_mapper_artifacts.joblib")
+    if '--cached' in sys.argv and artifacts_file.exists():
+        mapper.load_artifacts(artifacts_file)
+    else:
+        # Train the mapper, streaming the analysis file so the corpus is
+        # parsed record by record instead of loaded whole; the second
+        # pass streams it again for prediction.
+        with open(analysis_file, 'rb') as f:
+            mapper.train(ijson.items(f, 'item', use_float=True))
+        mapper.save_artifacts(artifacts_file)
     
     # Generate predictions
-    mappings = mapper.predict_collection_fields(all_fields)
+    with open(analysis_file, 'rb') as f:
+        mappings = mapper.predict_collection_fields(ijson.items(f, 'item', use_float=True))
     
     # Generate report
-    output_file = f"model_analysis/ml_field_mappings_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_file = f"model_analysis/ml_field_mappings_{datetime.now():%Y%m%d_%H%M%S}.json"
     mapper.generate_mapping_report(mappings, output_file)
     
-    # Save mappings as CSV for easy review
+    # Save mappings as CSV for easy review, streaming one row per
+    # mapping instead of materializing a second full table
     csv_file = output_file.replace('.json', '.csv')
-    mappings_df = pd.DataFrame([
-        {
-            'form_field': m.form_field_id,
-            'form_name': m.form_name,
-            'collection_field': m.collection_field,
-            'confidence': m.confidence,
-            'persona': m.persona,
-            'context': m.context
-        }
-        for m in mappings
-    ])
-    mappings_df.to_csv(csv_file, index=False)
+    with open(csv_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['form_field', 'form_name', 'collection_field',
+                         'confidence', 'persona', 'context'])
+        for m in mappings:
+            writer.writerow([m.form_field_id, m.form_name, m.collection_field,
+                             m.confidence, m.persona, m.context])
     
     logger.info(f"Mappings saved to {csv_file}")
     
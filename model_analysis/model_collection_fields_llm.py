@@ -1,6 +1,11 @@
+import asyncio
+import hashlib
 import os
+import sys
 import json
 import glob
+import time
+from collections import defaultdict
 from datetime import datetime
 import openai
 
@@ -13,6 +18,17 @@ openai.api_key = api_key
 LLM_BATCH_DIR = "model_analysis/llm_batches"
 MODEL = "gpt-4-turbo"
 MAX_RECORDS = 2000  # safety limit
+# Persona batches are independent, so they run concurrently; the
+# semaphore keeps the number of in-flight requests under the account's
+# rate limits.
+NUM_CONCURRENT = 8
+MAX_ATTEMPTS = 5
+
+# Persona field lists rarely change between iterations on the batch
+# splitter, so responses are cached on disk keyed by the exact inputs:
+# identical (fields, model, prompt) never pays for a second API call, and
+# editing the prompt or model invalidates old entries automatically.
+CACHE_DIR = os.path.join(LLM_BATCH_DIR, ".cache")
 
 PROMPT_TEMPLATE = '''
 You are an expert in data modeling for immigration forms. Given the following list of form fields (with persona, domain, value, screen_label, etc.), group them into canonical collection fields. For each collection field, specify:
@@ -38,19 +54,59 @@ Input fields:
 Respond with a JSON array of collection fields as described.
 '''
 
-def run_llm_collection_model(fields):
-    prompt = PROMPT_TEMPLATE.format(fields_json=json.dumps(fields, ensure_ascii=False))
+# Bundled requests share one copy of the long preamble above across
+# several small personas; the input and output both become JSON objects
+# keyed by persona name.
+BUNDLE_PROMPT_TEMPLATE = PROMPT_TEMPLATE + '''
+Note: the input above is a JSON object keyed by persona name, one field
+list per persona. Model each persona's fields independently, following
+all the instructions, and respond with a single JSON object mapping each
+persona name to its JSON array of collection fields.
+'''
+
+# Rough input-token cap per request at ~4 chars/token; personas whose
+# combined field JSON stays under it can ride in one request.
+BUNDLE_TOKEN_BUDGET = 60_000
+
+def _cache_key(fields, model, prompt_template):
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha256(payload + model.encode() + prompt_template.encode()).hexdigest()
+
+async def _run_llm_json(client, fields, prompt_template):
+    cache_file = os.path.join(CACHE_DIR, f"{_cache_key(fields, MODEL, prompt_template)}.json")
+    try:
+        with open(cache_file, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    prompt = prompt_template.format(fields_json=json.dumps(fields, ensure_ascii=False))
     try:
-        response = openai.chat.completions.create(
-            model=MODEL,
-            messages=[{"role": "system", "content": "You are a helpful assistant."},
-                      {"role": "user", "content": prompt}],
-            max_tokens=4000,
-            temperature=0.2,
-        )
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                response = await client.chat.completions.create(
+                    model=MODEL,
+                    messages=[{"role": "system", "content": "You are a helpful assistant."},
+                              {"role": "user", "content": prompt}],
+                    max_tokens=4000,
+                    temperature=0.2,
+                )
+                break
+            except (openai.RateLimitError, openai.APITimeoutError) as e:
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise
+                print(f"Retryable API error (attempt {attempt + 1}): {e}")
+                await asyncio.sleep(2 ** attempt)
         content = response.choices[0].message.content
         try:
             results = json.loads(content)
+            # Cache only parsed successes, written atomically so a crashed
+            # run never leaves a truncated entry; None/error responses are
+            # never cached, so transient failures retry next run.
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_file = cache_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(results, f)
+            os.replace(tmp_file, cache_file)
             return results
         except Exception as e:
             print(f"JSON decode error: {e}\nRaw LLM output:\n{content[:1000]}\n...")
@@ -59,27 +115,186 @@ def run_llm_collection_model(fields):
         print(f"LLM error: {e}")
         return None
 
-def main():
-    files = sorted(glob.glob(os.path.join(LLM_BATCH_DIR, "*_llm.json")))
+async def run_llm_collection_model(client, fields):
+    return await _run_llm_json(client, fields, PROMPT_TEMPLATE)
+
+async def run_llm_bundle(client, bundle):
+    """Model a bundle of personas; returns {persona: results}."""
+    if len(bundle) == 1:
+        persona, fields = bundle[0]
+        return {persona: await run_llm_collection_model(client, fields)}
+    payload = {persona: fields for persona, fields in bundle}
+    results = await _run_llm_json(client, payload, BUNDLE_PROMPT_TEMPLATE)
+    if not isinstance(results, dict):
+        print(f"Bundle response was not keyed by persona; no output for {list(payload)}")
+        return {persona: None for persona in payload}
+    return {persona: results.get(persona) for persona in payload}
+
+def bundle_personas(ready):
+    """Pack (persona, fields) pairs into bundles under the token budget.
+
+    The instruction preamble costs ~400 tokens per request, so small
+    personas share a request (and an RPM slot) instead of each paying for
+    their own copy; a persona too large to share travels alone.
+    """
+    bundles = []
+    current, current_tokens = [], 0
+    for persona, filtered in ready:
+        tokens = len(json.dumps(filtered, ensure_ascii=False)) // 4
+        if current and current_tokens + tokens > BUNDLE_TOKEN_BUDGET:
+            bundles.append(current)
+            current, current_tokens = [], 0
+        current.append((persona, filtered))
+        current_tokens += tokens
+    if current:
+        bundles.append(current)
+    return bundles
+
+def load_persona_batch(fpath):
+    """Load one persona batch file."""
+    persona = os.path.basename(fpath).replace("_llm.json", "")
+    with open(fpath, "r") as f:
+        return persona, json.load(f)
+
+def filter_records(fields):
+    # Filter to non-null value and persona
+    return [rec for rec in fields if rec.get("persona") and rec.get("value")]
+
+def write_collection_model(persona, results):
+    out_file = os.path.join(LLM_BATCH_DIR, f"{persona}_collection_model.json")
+    if results:
+        with open(out_file, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"  Wrote collection model to {out_file}")
+    else:
+        print(f"  No output for {persona}")
+
+async def model_personas(batches):
+    """Model the persona field lists concurrently, bundled when small.
+
+    One task per bundle, writing each persona's output as soon as its
+    bundle lands; gather(return_exceptions=True) reports failures without
+    aborting the other bundles.
+    """
+    client = openai.AsyncOpenAI(api_key=api_key)
+    semaphore = asyncio.Semaphore(NUM_CONCURRENT)
+
+    ready = []
+    for persona, fields in batches.items():
+        filtered = filter_records(fields)
+        print(f"Persona {persona}: {len(filtered)} fields to model.")
+        if len(filtered) > MAX_RECORDS:
+            print(f"  SKIPPED {persona}: Too many records for LLM ({len(filtered)} > {MAX_RECORDS})")
+            continue
+        ready.append((persona, filtered))
+    bundles = bundle_personas(ready)
+
+    async def process_bundle(bundle):
+        async with semaphore:
+            results = await run_llm_bundle(client, bundle)
+        for persona, persona_results in results.items():
+            write_collection_model(persona, persona_results)
+
+    tasks = [process_bundle(bundle) for bundle in bundles]
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    for bundle, outcome in zip(bundles, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"FAILED {[persona for persona, _ in bundle]}: {outcome}")
+
+def run_batch_api(files, poll_interval=60):
+    """Model all personas through the OpenAI Batch API.
+
+    The job is offline and latency-insensitive, so it takes the Batch
+    API's half price and separate rate-limit pool: one chat request per
+    persona uploaded as JSONL, polled until the batch completes, then
+    each persona's output is written keyed by custom_id.
+    """
+    client = openai.OpenAI(api_key=api_key)
+    lines = []
     for fpath in files:
-        persona = os.path.basename(fpath).replace("_llm.json", "")
-        print(f"Processing persona: {persona}")
-        with open(fpath, "r") as f:
-            fields = json.load(f)
-        # Filter to non-null value and persona
-        filtered = [rec for rec in fields if rec.get("persona") and rec.get("value")]
-        print(f"  {len(filtered)} fields to model.")
+        persona, fields = load_persona_batch(fpath)
+        filtered = filter_records(fields)
+        print(f"Persona {persona}: {len(filtered)} fields to model.")
         if len(filtered) > MAX_RECORDS:
-            print(f"  SKIPPED: Too many records for LLM ({len(filtered)} > {MAX_RECORDS})")
+            print(f"  SKIPPED {persona}: Too many records for LLM ({len(filtered)} > {MAX_RECORDS})")
+            continue
+        prompt = PROMPT_TEMPLATE.format(fields_json=json.dumps(filtered, ensure_ascii=False))
+        lines.append(json.dumps({
+            "custom_id": persona,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": MODEL,
+                "messages": [{"role": "system", "content": "You are a helpful assistant."},
+                             {"role": "user", "content": prompt}],
+                "max_tokens": 4000,
+                "temperature": 0.2,
+            },
+        }))
+    if not lines:
+        print("No persona batches to submit.")
+        return
+    batch_input = client.files.create(
+        file=("requests.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    job = client.batches.create(
+        input_file_id=batch_input.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"Submitted batch {job.id} with {len(lines)} personas; polling every {poll_interval}s...")
+    while job.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_interval)
+        job = client.batches.retrieve(job.id)
+    if job.status != "completed" or not job.output_file_id:
+        print(f"Batch {job.id} finished with status {job.status}; no results to apply.")
+        return
+    output = client.files.content(job.output_file_id).text
+    for line in output.splitlines():
+        if not line.strip():
             continue
-        results = run_llm_collection_model(filtered)
-        out_file = os.path.join(LLM_BATCH_DIR, f"{persona}_collection_model.json")
-        if results:
-            with open(out_file, "w") as f:
-                json.dump(results, f, indent=2)
-            print(f"  Wrote collection model to {out_file}")
-        else:
-            print(f"  No output for {persona}")
+        entry = json.loads(line)
+        persona = entry["custom_id"]
+        try:
+            content = entry["response"]["body"]["choices"][0]["message"]["content"]
+            results = json.loads(content)
+        except Exception as e:
+            print(f"Bad batch result for {persona}: {e}")
+            results = None
+        write_collection_model(persona, results)
+
+def run_pipeline(input_file="model_analysis/collection_mapping_llm.json"):
+    """Model collection fields straight from the full mapping file.
+
+    Skips the {persona}_llm.json round-trip: the records are grouped by
+    persona in memory (the same split split_by_persona.py performs on
+    disk) and handed directly to the concurrent modeling path, so only
+    the final {persona}_collection_model.json files touch disk.
+    """
+    with open(input_file, "r") as f:
+        records = json.load(f)
+    batches = defaultdict(list)
+    for rec in records:
+        persona = rec.get("persona")
+        if persona:
+            batches[persona].append(rec)
+    print(f"Personas found: {list(batches.keys())}")
+    asyncio.run(model_personas(batches))
+
+def main():
+    # --pipeline models straight from collection_mapping_llm.json without
+    # the per-persona batch files; --batch trades latency for the Batch
+    # API's half price; the default concurrent path reads the batch files
+    # and streams results back in minutes.
+    if "--pipeline" in sys.argv:
+        run_pipeline()
+        return
+    files = sorted(glob.glob(os.path.join(LLM_BATCH_DIR, "*_llm.json")))
+    if "--batch" in sys.argv:
+        run_batch_api(files)
+    else:
+        asyncio.run(model_personas(dict(load_persona_batch(fpath) for fpath in files)))
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
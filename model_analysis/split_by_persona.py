@@ -1,14 +1,20 @@
 import os
 import json
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 INPUT_FILE = "model_analysis/collection_mapping_llm.json"
 OUTPUT_DIR = "model_analysis/llm_batches"
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-with open(INPUT_FILE, "r") as f:
-    data = json.load(f)
+with open(INPUT_FILE, "rb") as f:
+    data = orjson.loads(f.read()) if orjson is not None else json.load(f)
 
 batches = defaultdict(list)
 for rec in data:
@@ -16,10 +22,21 @@ for rec in data:
     if persona:
         batches[persona].append(rec)
 
-for persona, records in batches.items():
+# One file per persona; the writes are independent, so they overlap in a
+# small thread pool, and orjson pretty-prints several times faster than
+# stdlib on the largest personas.
+def write_batch(item):
+    persona, records = item
     out_file = os.path.join(OUTPUT_DIR, f"{persona}_llm.json")
-    with open(out_file, "w") as f:
-        json.dump(records, f, indent=2)
-    print(f"Wrote {len(records)} records to {out_file}")
+    with open(out_file, "wb") as f:
+        if orjson is not None:
+            f.write(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+        else:
+            f.write(json.dumps(records, indent=2).encode("utf-8"))
+    return len(records), out_file
+
+with ThreadPoolExecutor(max_workers=min(8, len(batches) or 1)) as executor:
+    for count, out_file in executor.map(write_batch, batches.items()):
+        print(f"Wrote {count} records to {out_file}")
 
-print(f"Personas found: {list(batches.keys())}") 
\ No newline at end of file
+print(f"Personas found: {list(batches.keys())}")
@@ -1,17 +1,31 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 import uvicorn
+import asyncio
 import os
 import json
 import sys
+from functools import lru_cache
 from typing import List, Dict, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add the project root to import the FormFieldAnalyzer
 sys.path.append(os.path.abspath('.'))
 from model_analysis.analyze_form_fields import FormFieldAnalyzer
 
-app = FastAPI()
+# ORJSONResponse serializes the many-KB analyze payloads several times
+# faster than the default JSONResponse inside the event loop.
+app = FastAPI(default_response_class=ORJSONResponse if orjson is not None else JSONResponse)
+
+# Compress the large JSON payloads; small responses (health checks etc.)
+# skip the gzip overhead.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +39,55 @@ app.add_middleware(
 analyzer = FormFieldAnalyzer()
 USCIS_FORMS_DIR = "./uscis_forms"
 
+# PDF parsing dominates /analyze latency and the forms rarely change, so
+# results are cached per (form_id, mtime): only the first request for a
+# form (or a request after the PDF is replaced) pays the parse.
+@lru_cache(maxsize=128)
+def _analyze_form_cached(form_id: str, mtime: float) -> Dict[str, Any]:
+    return analyzer.analyze_form(os.path.join(USCIS_FORMS_DIR, f"{form_id}.pdf"), f"{form_id}.pdf")
+
+def _load_json(path):
+    # orjson decodes several times faster than stdlib on large field files.
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read()) if orjson is not None else json.load(f)
+
+def _dump_json(path, data):
+    with open(path, 'wb') as f:
+        if orjson is not None:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            f.write(json.dumps(data, indent=2).encode('utf-8'))
+
+# Saved field mappings per form, keyed by field_name. Loaded from disk
+# once per form and updated in memory, so each save is an O(1) dict
+# update instead of a list scan plus a full-file rewrite. Writes are
+# debounced: a burst of per-keystroke saves collapses into one flush.
+_saved_fields: Dict[str, Dict[str, Any]] = {}
+_flush_tasks: Dict[str, asyncio.Task] = {}
+SAVE_DEBOUNCE_SECONDS = 0.25
+
+def _get_saved_fields(form_id: str) -> Dict[str, Any]:
+    if form_id not in _saved_fields:
+        filled_file = os.path.join(USCIS_FORMS_DIR, f"filled_{form_id}.json")
+        if os.path.exists(filled_file):
+            data = _load_json(filled_file)
+            _saved_fields[form_id] = {field["field_name"]: field for field in data.get("fields", [])}
+        else:
+            _saved_fields[form_id] = {}
+    return _saved_fields[form_id]
+
+async def _flush_saved_fields(form_id: str):
+    await asyncio.sleep(SAVE_DEBOUNCE_SECONDS)
+    filled_file = os.path.join(USCIS_FORMS_DIR, f"filled_{form_id}.json")
+    data = {"form_id": form_id, "fields": list(_saved_fields[form_id].values())}
+    _dump_json(filled_file, data)
+
+def _schedule_flush(form_id: str):
+    task = _flush_tasks.get(form_id)
+    if task is not None and not task.done():
+        task.cancel()
+    _flush_tasks[form_id] = asyncio.create_task(_flush_saved_fields(form_id))
+
 @app.get("/api/health")
 async def health():
     return {"status": "healthy", "message": "Backend is running!"}
@@ -56,42 +119,32 @@ async def analyze_form(form_id: str):
         if not os.path.exists(form_path):
             raise HTTPException(status_code=404, detail="Form not found")
         
-        # Extract fields using existing analyzer
-        form_fields = analyzer.analyze_form(form_path, f"{form_id}.pdf")
-        
-        # Convert to list format
-        fields = []
-        for field_name, field_data in form_fields.items():
-            fields.append({
+        # Extract fields using existing analyzer (cached per PDF mtime)
+        form_fields = _analyze_form_cached(form_id, os.path.getmtime(form_path))
+
+        # Convert to list format, merging any saved data in the same pass.
+        # The in-memory store is the source of truth: it includes saves
+        # not yet flushed to disk. Fields without a saved record fall
+        # through to the extracted values via the shared empty dict.
+        saved_fields = _get_saved_fields(form_id)
+        empty: Dict[str, Any] = {}
+        fields = [
+            {
                 "field_name": field_name,
                 "form_id": form_id,
                 "tooltip": field_data.get("tooltip", ""),
                 "type": field_data.get("type", ""),
                 "page": field_data.get("page", 0),
-                "persona": field_data.get("persona"),
-                "domain": field_data.get("domain"),
+                "persona": (saved := saved_fields.get(field_name, empty)).get("persona", field_data.get("persona")),
+                "domain": saved.get("domain", field_data.get("domain")),
                 "screen_label": field_data.get("screen_label"),
                 "value_info": field_data.get("value_info"),
-                # Add mapping fields
-                "mapped_collection_field": None,
-                "is_new_collection_field": False
-            })
-        
-        # Load saved data if it exists
-        filled_file = os.path.join(USCIS_FORMS_DIR, f"filled_{form_id}.json")
-        if os.path.exists(filled_file):
-            with open(filled_file, 'r') as f:
-                saved_data = json.load(f)
-                saved_fields = {field["field_name"]: field for field in saved_data.get("fields", [])}
-                
-                # Merge saved data with extracted fields
-                for field in fields:
-                    if field["field_name"] in saved_fields:
-                        saved_field = saved_fields[field["field_name"]]
-                        field["persona"] = saved_field.get("persona", field["persona"])
-                        field["domain"] = saved_field.get("domain", field["domain"])
-                        field["mapped_collection_field"] = saved_field.get("mapped_collection_field")
-                        field["is_new_collection_field"] = saved_field.get("is_new_collection_field", False)
+                # Mapping fields only exist on saved records
+                "mapped_collection_field": saved.get("mapped_collection_field"),
+                "is_new_collection_field": saved.get("is_new_collection_field", False)
+            }
+            for field_name, field_data in form_fields.items()
+        ]
         
         return {
             "success": True,
@@ -107,32 +160,11 @@ async def analyze_form(form_id: str):
 async def save_field_mapping(form_id: str, field_data: Dict[str, Any]):
     """Save individual field mapping data"""
     try:
-        filled_file = os.path.join(USCIS_FORMS_DIR, f"filled_{form_id}.json")
-        
-        # Load existing data or create new
-        if os.path.exists(filled_file):
-            with open(filled_file, 'r') as f:
-                data = json.load(f)
-        else:
-            data = {"form_id": form_id, "fields": []}
-        
-        # Update or add field
-        field_name = field_data["field_name"]
-        existing_field = None
-        for i, field in enumerate(data["fields"]):
-            if field["field_name"] == field_name:
-                existing_field = i
-                break
-        
-        if existing_field is not None:
-            data["fields"][existing_field] = field_data
-        else:
-            data["fields"].append(field_data)
-        
-        # Save back to file
-        with open(filled_file, 'w') as f:
-            json.dump(data, f, indent=2)
-        
+        # Update or add field: O(1) dict assignment against the in-memory
+        # store, with the file rewrite deferred to the debounced flush.
+        _get_saved_fields(form_id)[field_data["field_name"]] = field_data
+        _schedule_flush(form_id)
+
         return {"success": True, "message": "Field saved successfully"}
         
     except Exception as e: